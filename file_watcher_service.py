@@ -104,6 +104,7 @@ TV_SHOW_PATTERNS = [
 MOVIE_YEAR_PATTERN = r'(.*?)[. _](\d{4})[. _]'  # Movie Name 2023 pattern
 
 VIDEO_EXTENSIONS = ['.mp4', '.mkv', '.avi', '.mov', '.wmv', '.m4v', '.flv']
+NAME_SEPARATORS = str.maketrans('._', '  ')  # Dots/underscores used as spaces
 
 
 class ProcessingManager:
@@ -1332,7 +1333,7 @@ class MediaCategorizer:
         Returns:
             Cleaned name
         """
-        return re.sub(r'[._]', ' ', name).strip()
+        return name.translate(NAME_SEPARATORS).strip()
     
     def calculate_similarity(self, a: str, b: str) -> float:
         """Calculate string similarity between two strings.
@@ -1346,6 +1347,28 @@ class MediaCategorizer:
         """
         return SequenceMatcher(None, a.lower(), b.lower()).ratio()
     
+    def similarity_scorer(self, query: str) -> Callable[[str], float]:
+        """Build a scorer comparing many candidates against one query.
+        
+        The query is lowercased once and the matcher is reused. Scores are
+        the same as calculate_similarity(query, candidate); the query stays
+        the first sequence because ratio() is not symmetric.
+        
+        Args:
+            query: String the candidates are compared to
+            
+        Returns:
+            Function returning the similarity score (0.0 to 1.0) of a candidate
+        """
+        matcher = SequenceMatcher(None)
+        matcher.set_seq1(query.lower())
+        
+        def score(candidate: str) -> float:
+            matcher.set_seq2(candidate.lower())
+            return matcher.ratio()
+        
+        return score
+    
     def initial_categorization(self, filename: str) -> Tuple[str, Dict[str, Any]]:
         """
         Initial categorization using regex patterns.
@@ -1417,11 +1440,13 @@ class MediaCategorizer:
                 # Calculate confidence score based on name similarity
                 candidates = []
                 print(f"   > Multiple matches found. Calculating confidence scores...")
+                similarity = self.similarity_scorer(show_name)
+                show_name_lower = show_name.lower()
                 
                 for result in results:
-                    sim_score = self.calculate_similarity(show_name, result["name"])
+                    sim_score = similarity(result["name"])
                     # Add bonus for exact matches
-                    if show_name.lower() == result["name"].lower():
+                    if show_name_lower == result["name"].lower():
                         sim_score += 0.2
                     # Add recent show bonus
                     if result.get("first_air_date") and result["first_air_date"] > "2015-01-01":
@@ -1504,9 +1529,10 @@ class MediaCategorizer:
                 # Calculate confidence for each result
                 candidates = []
                 print(f"   > Multiple matches found. Calculating confidence scores...")
+                similarity = self.similarity_scorer(movie_name)
                 
                 for result in results:
-                    sim_score = self.calculate_similarity(movie_name, result["title"])
+                    sim_score = similarity(result["title"])
                     
                     # Add bonus for matching year
                     result_year = result.get("release_date", "")[:4] if result.get("release_date") else ""
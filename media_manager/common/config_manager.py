@@ -1,9 +1,13 @@
 """Configuration management module."""
 import json
 import os
+import re
 import logging
 from typing import Dict, Any
 
+# ${VAR} placeholders in config values, filled from the environment
+_ENV_RE = re.compile(r'\$\{([A-Z_][A-Z0-9_]*)\}')
+
 class ConfigManager:
     """Manages configuration loading and access."""
     
@@ -22,7 +26,7 @@ class ConfigManager:
         """Load configuration from file."""
         try:
             with open(self.config_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+                return self._substitute_env(json.load(f))
         except FileNotFoundError:
             self.logger.error(f"Configuration file not found: {self.config_path}")
             raise
@@ -30,6 +34,22 @@ class ConfigManager:
             self.logger.error(f"Invalid JSON in configuration file: {e}")
             raise
             
+    @classmethod
+    def _substitute_env(cls, value: Any) -> Any:
+        """Replace ${VAR} placeholders with environment variables.
+        
+        Placeholders for unset variables are left as they are.
+        """
+        if isinstance(value, str):
+            if '${' not in value:
+                return value
+            return _ENV_RE.sub(lambda m: os.environ.get(m.group(1), m.group(0)), value)
+        if isinstance(value, dict):
+            return {key: cls._substitute_env(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [cls._substitute_env(item) for item in value]
+        return value
+            
     def _load_secrets(self) -> None:
         """Load secrets from Docker secrets or environment variables."""
         # Define secret mappings
@@ -2,19 +2,22 @@
 import time
 import asyncio
 import threading
-from typing import Dict, Any, Optional, Union
+from typing import Callable, Dict, Any, Optional, Union
 from collections import defaultdict
 
 class AsyncRateLimiter:
     """Rate limiter for async operations."""
     
-    def __init__(self, min_interval: float = 1.0):
+    def __init__(self, min_interval: float = 1.0,
+                 time_source: Callable[[], float] = time.time):
         """Initialize rate limiter.
         
         Args:
             min_interval: Minimum interval between updates in seconds
+            time_source: Clock returning the current time in seconds
         """
         self.min_interval = min_interval
+        self._time = time_source
         self._last_update: Dict[str, float] = defaultdict(float)
         self._lock = asyncio.Lock()
         self._context_depth = 0
@@ -29,7 +32,7 @@ class AsyncRateLimiter:
     
     async def can_update(self, key: str) -> bool:
         """Check if operation can proceed."""
-        now = time.time()
+        now = self._time()
         if now - self._last_update[key] >= self.min_interval:
             self._last_update[key] = now
             return True
@@ -37,11 +40,55 @@ class AsyncRateLimiter:
     
     async def wait_if_needed(self, key: str) -> None:
         """Wait until operation can proceed."""
-        now = time.time()
+        now = self._time()
         elapsed = now - self._last_update[key]
         if elapsed < self.min_interval:
             await asyncio.sleep(self.min_interval - elapsed)
-        self._last_update[key] = time.time()
+        self._last_update[key] = self._time()
+
+class AsyncTokenBucket:
+    """Token bucket that paces async operations to a request budget."""
+    
+    def __init__(self, rate: float, period: float = 1.0,
+                 time_source: Callable[[], float] = time.monotonic):
+        """Initialize token bucket.
+        
+        Args:
+            rate: Operations allowed per period, also the burst size
+            period: Length of the period in seconds
+            time_source: Clock returning the current time in seconds
+        """
+        self.capacity = rate
+        self._time = time_source
+        self._refill_rate = rate / period
+        self._tokens = rate
+        self._last_refill = time_source()
+        self._lock = asyncio.Lock()
+    
+    async def __aenter__(self):
+        """Take a token, waiting for one if needed."""
+        await self.acquire()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Exit async context."""
+        return None
+    
+    def _refill(self) -> None:
+        """Add the tokens earned since the last refill."""
+        now = self._time()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self._refill_rate)
+        self._last_refill = now
+    
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        # Waiters queue on the lock, so tokens are handed out in FIFO order
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self._refill_rate)
+                self._refill()
+            self._tokens -= 1
 
 class ThreadedRateLimiter:
     """Rate limiter for threaded operations."""
@@ -77,20 +124,23 @@ class ThreadedRateLimiter:
 class SpeedLimiter:
     """Limits data transfer speed."""
     
-    def __init__(self, max_speed_mbps: Optional[float] = None):
+    def __init__(self, max_speed_mbps: Optional[float] = None,
+                 time_source: Callable[[], float] = time.time):
         """Initialize speed limiter.
         
         Args:
             max_speed_mbps: Maximum speed in megabits per second
+            time_source: Clock returning the current time in seconds
         """
         self.max_speed_mbps = max_speed_mbps
+        self._time = time_source
         self._bytes_sent = 0
-        self._last_reset = time.time()
+        self._last_reset = time_source()
         self._lock = asyncio.Lock()
     
     def _reset_if_needed(self) -> None:
         """Reset counters if too much time has passed."""
-        now = time.time()
+        now = self._time()
         if now - self._last_reset > 1.0:  # Reset every second
             self._bytes_sent = 0
             self._last_reset = now
@@ -108,7 +158,7 @@ class SpeedLimiter:
         if self._bytes_sent == 0:
             return 0.0
         
-        elapsed = time.time() - self._last_reset
+        elapsed = self._time() - self._last_reset
         target_time = self._bytes_sent / max_bytes_per_sec
         
         # Calculate the delay needed to maintain the target speed
@@ -105,7 +105,10 @@ class TelegramDownloader:
         async def handle_media(message):
             """Handle incoming media messages."""
             try:
-                await self.download_manager.process_media_message(message)
+                task = await self.download_manager.process_media_message(message)
+                if task is None:
+                    await self.bot.reply_to(message, "This file is already being downloaded!")
+                    return
                 await self.bot.reply_to(message, 
                     f"Media received and added to download queue.\n"
                     f"Current queue: {self.download_manager.get_queue_status()}"
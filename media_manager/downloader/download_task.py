@@ -6,8 +6,7 @@ import datetime
 import asyncio
 import os
 
-from media_manager.common.rate_limiters import RateLimiter
-from media_manager.common.stats_manager import StatsManager
+from media_manager.common.rate_limiters import AsyncRateLimiter, StatsManager
 
 @dataclass
 class DownloadTask:
@@ -17,6 +16,8 @@ class DownloadTask:
     filename: str
     chat_id: int
     message_id: int
+    # Stays the same when a file is forwarded or re-sent, unlike file_id
+    file_unique_id: Optional[str] = None
     status_message_id: Optional[int] = None
     start_time: float = field(default_factory=time.time)
     total_size: Optional[int] = None
@@ -167,19 +168,25 @@ class DownloadManager:
         
         # Initialize state
         self._active_downloads = {}
+        # file_unique_id (or file_id) of every queued or active download
+        self._pending_files = set()
         self._download_queue = asyncio.Queue()
         self._worker_tasks = set()
         self._download_lock = asyncio.Lock()
         
         # Statistics and rate limiting
         self.stats_manager = StatsManager()
-        self.rate_limiter = RateLimiter()
+        self.rate_limiter = AsyncRateLimiter()
         
         # Create download directory if it doesn't exist
         os.makedirs(self.download_dir, exist_ok=True)
 
-    async def process_media_message(self, message):
-        """Process an incoming media message."""
+    async def process_media_message(self, message) -> Optional[DownloadTask]:
+        """Process an incoming media message.
+        
+        Returns:
+            The queued task, or None if the same file is already queued or downloading
+        """
         try:
             file_info = None
             if message.document:
@@ -192,16 +199,24 @@ class DownloadManager:
             if not file_info:
                 raise ValueError("No supported media found in message")
 
+            # Forwards of a file arrive with a new file_id but the same file_unique_id
+            file_unique_id = getattr(file_info, "file_unique_id", None)
+            file_key = file_unique_id or file_info.file_id
+            if file_key in self._pending_files:
+                return None
+
             # Create download task
             task = DownloadTask(
                 file_id=file_info.file_id,
                 filename=os.path.join(self.download_dir, self._get_safe_filename(file_info.file_name)),
                 total_size=file_info.file_size,
                 chat_id=message.chat.id,
-                message_id=message.message_id
+                message_id=message.message_id,
+                file_unique_id=file_unique_id
             )
             
             # Add to download queue
+            self._pending_files.add(file_key)
             await self._download_queue.put(task)
             
             # Start worker if needed
@@ -214,6 +229,7 @@ class DownloadManager:
                     f"Size: {self._format_size(task.total_size)}",
                     level="info"
                 )
+            return task
                 
         except Exception as e:
             error_msg = f"Failed to process media: {str(e)}"
@@ -265,11 +281,9 @@ class DownloadManager:
             task.end_time = time.time()
             
             # Update statistics
-            await self.stats_manager.update(
-                total_downloads=self.stats_manager.stats.total_downloads + 1,
-                successful_downloads=self.stats_manager.stats.successful_downloads + 1,
-                total_bytes=self.stats_manager.stats.total_bytes + task.total_size
-            )
+            self.stats_manager.increment('downloads', 'total')
+            self.stats_manager.increment('downloads', 'successful')
+            self.stats_manager.increment('downloads', 'total_bytes', task.total_size or 0)
             
             if self.notification:
                 await self.notification.notify(
@@ -287,13 +301,12 @@ class DownloadManager:
                     f"Error: {str(e)}",
                     level="error"
                 )
-            await self.stats_manager.update(
-                total_downloads=self.stats_manager.stats.total_downloads + 1,
-                failed_downloads=self.stats_manager.stats.failed_downloads + 1
-            )
+            self.stats_manager.increment('downloads', 'total')
+            self.stats_manager.increment('downloads', 'failed')
             
         finally:
             del self._active_downloads[task.file_id]
+            self._pending_files.discard(task.file_unique_id or task.file_id)
 
     def get_active_downloads(self) -> list:
         """Get list of current active downloads."""
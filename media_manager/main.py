@@ -48,6 +48,7 @@ class MediaManager:
         
         # Stop in reverse order
         await self.telegram_downloader.stop()
+        await self.media_categorizer.close()
         await self.notification_service.stop()
 
 async def main():
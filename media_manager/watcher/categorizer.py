@@ -1,9 +1,11 @@
 """File categorization and processing module."""
 import os
 import re
+import asyncio
 import shutil
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, Tuple
 from media_manager.watcher.tmdb_client import TMDBClient
 from media_manager.common.notification_service import NotificationService
@@ -20,6 +22,9 @@ class MediaCategorizer:
         r'^(?P<show>.+?)[\. ]S(?P<season>\d{1,2})E(?P<episode>\d{1,2})',
         r'^(?P<show>.+?)[\. ](?P<season>\d{1,2})x(?P<episode>\d{1,2})'
     ]
+    # Compiled once so parsing a filename never goes through the re cache
+    _MOVIE_RES = tuple(re.compile(p, re.IGNORECASE) for p in MOVIE_PATTERNS)
+    _TV_RES = tuple(re.compile(p, re.IGNORECASE) for p in TV_PATTERNS)
     
     def __init__(self, config_manager, notification_service: NotificationService):
         """Initialize categorizer."""
@@ -28,6 +33,10 @@ class MediaCategorizer:
         self.notification = notification_service
         self.config = config_manager.config  # Store config for easier access
         
+        # Dedicated pool for blocking file moves so they don't queue behind
+        # other users of the loop's default executor
+        self._fs_exec = ThreadPoolExecutor(max_workers=4, thread_name_prefix="fs-move")
+        
         # Validate TMDB API key
         tmdb_config = self.config_manager.get("tmdb", {})
         tmdb_api_key = tmdb_config.get("api_key")
@@ -38,8 +47,12 @@ class MediaCategorizer:
             self.tmdb = TMDBClient(tmdb_api_key)
             self.logger.info("TMDB client initialized successfully")
 
-    async def process_file(self, filepath: str) -> None:
-        """Process a media file through the categorization workflow."""
+    async def process_file(self, filepath: str) -> bool:
+        """Process a media file through the categorization workflow.
+        
+        Returns:
+            True once the file has been moved into the library
+        """
         try:
             filename = os.path.basename(filepath)
             start_time = time.time()
@@ -80,6 +93,7 @@ class MediaCategorizer:
                     f"✅ Processed {filename} in {elapsed:.1f} s\n"
                     f"Moved to: {new_path}"
                 )
+            return True
                 
         except Exception as e:
             if self.notification:
@@ -155,12 +169,19 @@ class MediaCategorizer:
                 f"Season {metadata['season']:02d}"
             )
             
-        os.makedirs(dest_dir, exist_ok=True)
         new_path = os.path.join(dest_dir, filename)
-        shutil.move(filepath, new_path)
+        await self._move_file(filepath, new_path)
         
         return new_path
 
+    async def _move_file(self, src: str, dst: str) -> None:
+        """Move a file on the file system pool, creating the destination directory."""
+        def move() -> None:
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            shutil.move(src, dst)
+            
+        await asyncio.get_running_loop().run_in_executor(self._fs_exec, move)
+
     @staticmethod
     def parse_movie_filename(filename: str) -> Tuple[Optional[str], Optional[str]]:
         """
@@ -172,8 +193,8 @@ class MediaCategorizer:
         Returns:
             Tuple of (title, year) or (None, None) if no match
         """
-        for pattern in MediaCategorizer.MOVIE_PATTERNS:
-            match = re.match(pattern, filename, re.IGNORECASE)
+        for regex in MediaCategorizer._MOVIE_RES:
+            match = regex.match(filename)
             if match:
                 groups = match.groupdict()
                 title = groups["title"].replace(".", " ").strip()
@@ -191,8 +212,8 @@ class MediaCategorizer:
         Returns:
             Tuple of (show_name, season_number, episode_number) or (None, None, None) if no match
         """
-        for pattern in MediaCategorizer.TV_PATTERNS:
-            match = re.match(pattern, filename, re.IGNORECASE)
+        for regex in MediaCategorizer._TV_RES:
+            match = regex.match(filename)
             if match:
                 groups = match.groupdict()
                 show = groups["show"].replace(".", " ").strip()
@@ -224,33 +245,33 @@ class MediaCategorizer:
                 )
                 return await self.move_to_unmatched(file_path)
 
+            # Fields used throughout; title and release_date are guaranteed
+            # by the TMDB client
+            movie_label = f"{movie_info['title']} ({movie_info['release_date'][:4]})"
+            rating = movie_info.get('vote_average', 'N/A')
+            
             # Create movie directory
             paths_config = self.config_manager.get("paths", {})
             movies_dir = paths_config.get("movies_dir", "media/movies")
-            movie_dir = os.path.join(
-                movies_dir,
-                f"{movie_info['title']} ({movie_info['release_date'][:4]})"
-            )
-            os.makedirs(movie_dir, exist_ok=True)
-
+            movie_dir = os.path.join(movies_dir, movie_label)
             # Move file
             new_path = os.path.join(movie_dir, filename)
             await self.notification.ensure_token_and_notify(
                 "MediaCategorizer",
                 f"📦 Moving Movie File:\n"
-                f"Title: {movie_info['title']} ({movie_info['release_date'][:4]})\n"
-                f"Rating: {movie_info.get('vote_average', 'N/A')}/10\n"
+                f"Title: {movie_label}\n"
+                f"Rating: {rating}/10\n"
                 f"To: {os.path.relpath(movie_dir, movies_dir)}",
                 level="info",
                 file_path=new_path
             )
-            shutil.move(file_path, new_path)
+            await self._move_file(file_path, new_path)
             
             await self.notification.ensure_token_and_notify(
                 "MediaCategorizer",
                 f"✅ Movie Processed Successfully!\n\n"
-                f"🎬 {movie_info['title']} ({movie_info['release_date'][:4]})\n"
-                f"⭐ Rating: {movie_info.get('vote_average', 'N/A')}/10\n"
+                f"🎬 {movie_label}\n"
+                f"⭐ Rating: {rating}/10\n"
                 f"📝 Overview: {movie_info.get('overview', 'No overview available.')[:150]}...\n\n"
                 f"The movie will appear in Jellyfin shortly.",
                 level="success",
@@ -308,7 +329,6 @@ class MediaCategorizer:
                 show_info['name']
             )
             season_dir = os.path.join(show_dir, f"Season {season:02d}")
-            os.makedirs(season_dir, exist_ok=True)
 
             # Move file
             new_path = os.path.join(season_dir, filename)
@@ -323,7 +343,7 @@ class MediaCategorizer:
                 level="info",
                 file_path=new_path
             )
-            shutil.move(file_path, new_path)
+            await self._move_file(file_path, new_path)
 
             await self.notification.ensure_token_and_notify(
                 "MediaCategorizer",
@@ -360,8 +380,7 @@ class MediaCategorizer:
         dest_path = os.path.join(unmatched_dir, os.path.basename(file_path))
         
         try:
-            os.makedirs(unmatched_dir, exist_ok=True)
-            shutil.move(file_path, dest_path)
+            await self._move_file(file_path, dest_path)
             await self.notification.ensure_token_and_notify(
                 "MediaCategorizer",
                 "Moved to unmatched directory",
@@ -391,4 +410,10 @@ class MediaCategorizer:
                 self.config["paths"]["tv_shows_dir"],
                 media_info["series_name"],
                 f"Season {media_info['season']:02d}"
-            )
\ No newline at end of file
+            )
+
+    async def close(self) -> None:
+        """Wait for pending file moves, then release the pool and TMDB session."""
+        await asyncio.get_running_loop().run_in_executor(None, self._fs_exec.shutdown)
+        if self.tmdb is not None:
+            await self.tmdb.close()
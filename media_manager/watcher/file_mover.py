@@ -1,10 +1,13 @@
 """File system watcher for processing downloaded media."""
 import os
+import sys
 import time
 import asyncio
+import functools
 import logging
-from typing import Dict, Any, Set
-from watchdog.observers import Observer
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Set, Tuple
+from watchdog.observers.api import BaseObserver
 from watchdog.events import FileSystemEventHandler, FileCreatedEvent
 from media_manager.watcher.categorizer import MediaCategorizer
 from media_manager.common.notification_service import NotificationService
@@ -13,141 +16,216 @@ import shutil
 class MediaFileHandler(FileSystemEventHandler):
     """Handles file system events for media files."""
     
-    def __init__(self, categorizer: MediaCategorizer, loop: asyncio.AbstractEventLoop):
-        """Initialize file handler."""
+    # Number of recently processed files remembered to suppress duplicate events
+    RECENT_FILES_LIMIT = 4096
+    
+    def __init__(self, categorizer: MediaCategorizer, loop: asyncio.AbstractEventLoop,
+                 max_concurrent: Optional[int] = None):
+        """Initialize file handler.
+        
+        Args:
+            categorizer: Media categorizer instance
+            loop: Event loop that processes the files
+            max_concurrent: Maximum files categorized at once (defaults to CPU count)
+        """
         self.categorizer = categorizer
+        # Resolved once; these run for every file
+        self._proc = categorizer.process_file
+        self._unmatched = categorizer.move_to_unmatched
         self.logger = logging.getLogger("MediaFileHandler")
+        # Only touched from the event loop thread, so plain set operations
+        # are enough to deduplicate concurrent events for the same path.
         self._processing_files: Set[str] = set()
-        self._processing_lock = asyncio.Lock()
+        # Recently processed files keyed by (path, size, mtime_ns), in LRU order
+        self._recent: "OrderedDict[Tuple[str, int, int], None]" = OrderedDict()
         self._loop = loop
-        self._stopping = False
-        self._tasks: Set[asyncio.Task] = set()
-        self._tasks_lock = asyncio.Lock()
-        
-    def on_created(self, event: FileCreatedEvent) -> None:
-        """Handle file creation events."""
-        if not event.is_directory and not self._stopping:
-            self.logger.info(f"New file detected: {event.src_path}")
-            future = asyncio.run_coroutine_threadsafe(
-                self._create_processing_task(event.src_path),
-                self._loop
-            )
-            future.add_done_callback(self._handle_task_result)
+        # Single-element list so the on_created closure shares the flag
+        self._stopping_flag = [False]
+        # Paths handed over from the observer thread, consumed by _batch_pump
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._pump: Optional[asyncio.Task] = None
+        # Bound concurrent categorizations so a burst of files doesn't fork
+        # a probe process and TMDB request for every one of them at once
+        self._sem = asyncio.Semaphore(max_concurrent or os.cpu_count() or 1)
+        # Shadows the class method; watchdog looks handlers up on the instance
+        self.on_created = self._make_on_created()
+        
+    @property
+    def _stopping(self) -> bool:
+        """Whether the handler is shutting down."""
+        return self._stopping_flag[0]
+        
+    def _make_on_created(self):
+        """Build the file creation callback run in the observer thread.
+        
+        Everything it touches is captured in closure cells, so each event
+        costs local loads instead of attribute lookups on self.
+        """
+        stopping = self._stopping_flag
+        call_soon_threadsafe = self._loop.call_soon_threadsafe
+        put_nowait = self._queue.put_nowait
+        log_info = self.logger.info
+        
+        def on_created(event: FileCreatedEvent) -> None:
+            """Handle file creation events."""
+            if stopping[0] or event.is_directory:
+                return
+            log_info("New file detected: %s", event.src_path)
+            call_soon_threadsafe(put_nowait, event.src_path)
             
-    async def _create_processing_task(self, file_path: str) -> None:
-        """Create and track a new processing task."""
-        try:
-            async with self._tasks_lock:
-                if not self._stopping:
-                    task = self._loop.create_task(self._handle_new_file(file_path))
-                    self._tasks.add(task)
-                    task.add_done_callback(self._remove_task)
-                    self.logger.debug(f"Created processing task for: {file_path}")
-        except Exception as e:
-            self.logger.error(f"Error creating task for {file_path}: {e}", exc_info=True)
+        return on_created
             
-    def _remove_task(self, task):
-        """Remove a completed task from the set."""
-        self._tasks.discard(task)
+    def start(self) -> None:
+        """Start consuming queued file events."""
+        if self._pump is None:
+            self._pump = self._loop.create_task(self._batch_pump())
             
-    def _handle_task_result(self, future):
-        """Handle the result of an async task."""
+    async def _batch_pump(self) -> None:
+        """Spawn a processing task for every queued path until cancelled.
+        
+        The task group owns the processing tasks, so cancelling the pump
+        cancels and awaits every file still in flight.
+        """
+        async with asyncio.TaskGroup() as tg:
+            while True:
+                file_path = await self._queue.get()
+                tg.create_task(self._process_event(file_path))
+                self.logger.debug("Created processing task for: %s", file_path)
+
+    async def _process_event(self, file_path: str) -> None:
+        """Process a queued path without letting errors reach the task group.
+
+        An exception escaping a child would cancel the task group and with
+        it the pump, silently stopping all further processing.
+        """
         try:
-            future.result()
+            await self._handle_new_file(file_path)
         except Exception as e:
-            self.logger.error(f"Error in file processing task: {e}", exc_info=True)
-            
+            self.logger.error("Unhandled error processing file %s: %s", file_path, e, exc_info=True)
+
     async def _handle_new_file(self, file_path: str) -> None:
         """Process newly created file."""
-        try:
-            # Check if already processing
-            async with self._processing_lock:
-                if file_path in self._processing_files:
-                    return
-                self._processing_files.add(file_path)
-                
-            self.logger.info(f"Starting to process file: {file_path}")
+        # Check if already processing
+        if file_path in self._processing_files:
+            return
             
-            # Wait for file to be ready with timeout
+        # Claimed before the first await so a concurrent event for the same
+        # path is dropped by the check above
+        self._processing_files.add(file_path)
+        try:
+            # Skip files that were already processed and haven't changed since
+            recent_key = await self._get_recent_key(file_path)
+            if recent_key in self._recent:
+                self._recent.move_to_end(recent_key)
+                self.logger.debug("Ignoring duplicate event for: %s", file_path)
+                return
+
+            self.logger.info("Starting to process file: %s", file_path)
             try:
-                await self._wait_for_file_ready(file_path, timeout=30)
+                st = await self._wait_for_file_ready(file_path, timeout=30)
             except TimeoutError:
-                self.logger.error(f"Timeout waiting for file to stabilize: {file_path}")
+                self.logger.error("Timeout waiting for file to stabilize: %s", file_path)
                 return
             except asyncio.CancelledError:
-                self.logger.info(f"Processing cancelled for file: {file_path}")
+                self.logger.info("Processing cancelled for file: %s", file_path)
                 return
-                
-            # Process the file
-            if not self._stopping:
-                try:
-                    success = await self.categorizer.process_file(file_path)
-                    if not success:
-                        await self.categorizer.move_to_unmatched(file_path)
-                except Exception as e:
-                    self.logger.error(f"Error processing file {file_path}: {e}", exc_info=True)
-                    await self.categorizer.move_to_unmatched(file_path)
-                    
+            if self._stopping:
+                return
+
+            try:
+                async with self._sem:
+                    success = await self._proc(file_path)
+            except Exception as e:
+                self.logger.error("Error processing file %s: %s", file_path, e, exc_info=True)
+                success = False
+            if success:
+                self._remember((file_path, st.st_size, st.st_mtime_ns))
+            else:
+                await self._move_to_unmatched_safely(file_path)
         finally:
             # Remove from processing set
-            async with self._processing_lock:
-                self._processing_files.discard(file_path)
-                self.logger.debug(f"Finished processing file: {file_path}")
+            self._processing_files.discard(file_path)
+            self.logger.debug("Finished processing file: %s", file_path)
+
+    async def _move_to_unmatched_safely(self, file_path: str) -> None:
+        """Fall back to the unmatched folder without letting errors reach the task group."""
+        try:
+            await self._unmatched(file_path)
+        except Exception as e:
+            self.logger.error("Error moving %s to unmatched: %s", file_path, e, exc_info=True)
 
-    async def _wait_for_file_ready(self, file_path: str, timeout: int = 30) -> None:
-        """Wait for file to be ready for processing."""
+    @staticmethod
+    async def _get_recent_key(file_path: str) -> Optional[Tuple[str, int, int]]:
+        """Get the key identifying the current version of a file."""
+        try:
+            st = await asyncio.to_thread(os.stat, file_path)
+        except OSError:
+            return None
+        return (file_path, st.st_size, st.st_mtime_ns)
+        
+    def _remember(self, recent_key: Optional[Tuple[str, int, int]]) -> None:
+        """Record a processed file, evicting the least recently seen ones."""
+        if recent_key is None:
+            return
+        self._recent[recent_key] = None
+        self._recent.move_to_end(recent_key)
+        while len(self._recent) > self.RECENT_FILES_LIMIT:
+            self._recent.popitem(last=False)
+
+    async def _wait_for_file_ready(self, file_path: str, timeout: int = 30) -> os.stat_result:
+        """Wait for file to be ready for processing.
+        
+        Returns:
+            The stat result of the stable file
+        """
         start_time = time.time()
         last_size = -1
         last_modified = 0
+        delay = 0.05
         
         while time.time() - start_time < timeout:
             if self._stopping:
                 raise asyncio.CancelledError()
                 
             try:
-                if not os.path.exists(file_path):
-                    await asyncio.sleep(0.1)
-                    continue
-                    
-                curr_size = os.path.getsize(file_path)
-                curr_modified = os.path.getmtime(file_path)
+                # The download dir may be a network mount; stat off the loop
+                st = await asyncio.to_thread(os.stat, file_path)
                 
-                if curr_size == last_size and curr_modified == last_modified:
+                if st.st_size == last_size and st.st_mtime == last_modified:
                     # File hasn't changed in 1 second
                     if time.time() - last_modified >= 1:
-                        return
+                        return st
                 else:
-                    last_size = curr_size
-                    last_modified = curr_modified
+                    last_size = st.st_size
+                    last_modified = st.st_mtime
                     
-                await asyncio.sleep(0.1)
+            except FileNotFoundError:
+                # Not created yet
+                pass
+            except OSError as e:
+                self.logger.warning("Error checking file: %s", e)
                 
-            except (OSError, IOError) as e:
-                self.logger.warning(f"Error checking file: {e}")
-                await asyncio.sleep(0.1)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.5)
                 
         raise TimeoutError(f"Timeout waiting for file to stabilize: {file_path}")
         
     async def stop(self):
         """Stop the file handler and wait for tasks to complete."""
-        self._stopping = True
-        
-        # Cancel and wait for all tasks
-        async with self._tasks_lock:
-            if self._tasks:
-                self.logger.info(f"Waiting for {len(self._tasks)} file processing tasks to complete...")
-                # Create list of tasks to avoid RuntimeError from set changing size
-                tasks = list(self._tasks)
-                # Cancel all tasks
-                for task in tasks:
-                    task.cancel()
-                # Wait for all tasks with timeout
-                try:
-                    await asyncio.wait(tasks, timeout=5)
-                except asyncio.TimeoutError:
-                    self.logger.warning("Timeout waiting for tasks to complete")
-                # Clear tasks set
-                self._tasks.clear()
+        self._stopping_flag[0] = True
+        
+        # Drop events that were queued but never picked up
+        while not self._queue.empty():
+            self._queue.get_nowait()
+            
+        # Cancel the pump; its task group cancels and waits for the tasks
+        if self._pump is not None:
+            self.logger.info("Waiting for file processing tasks to complete...")
+            self._pump.cancel()
+            done, _ = await asyncio.wait({self._pump}, timeout=5)
+            if not done:
+                self.logger.warning("Timeout waiting for tasks to complete")
+            self._pump = None
 
 class MediaWatcher:
     """Watches download directory for new media files."""
@@ -165,35 +243,75 @@ class MediaWatcher:
         self.categorizer = categorizer
         self.logger = logging.getLogger("MediaWatcher")
         
-        # Get event loop
-        try:
-            self._loop = asyncio.get_event_loop()
-        except RuntimeError:
-            self._loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(self._loop)
-            
-        # Initialize components
-        self.event_handler = MediaFileHandler(self.categorizer, self._loop)
-        self.observer = Observer()
+        # The loop and the handler bound to it are set up in start(), from
+        # whichever loop actually runs the watcher
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.event_handler: Optional[MediaFileHandler] = None
+        self.observer = self._create_observer()
         self._running = False
     
+    def _create_observer(self) -> BaseObserver:
+        """Create the file system observer for this platform.
+        
+        The native backend is picked explicitly so watchdog never falls back
+        to polling silently. Set config["watcher"]["backend"] to "polling"
+        for NFS/SMB mounts where native notifications don't work.
+        """
+        backend = self.config.get("watcher", {}).get("backend")
+        if not backend:
+            if sys.platform.startswith("linux"):
+                backend = "inotify"
+            elif sys.platform == "darwin":
+                backend = "fsevents"
+            elif sys.platform == "win32":
+                backend = "windows"
+            else:
+                backend = "polling"
+                
+        if backend == "inotify":
+            from watchdog.observers.inotify import InotifyObserver
+            observer = InotifyObserver()
+        elif backend == "fsevents":
+            from watchdog.observers.fsevents import FSEventsObserver
+            observer = FSEventsObserver()
+        elif backend == "windows":
+            from watchdog.observers.read_directory_changes import WindowsApiObserver
+            observer = WindowsApiObserver()
+        elif backend == "polling":
+            from watchdog.observers.polling import PollingObserver
+            observer = PollingObserver(timeout=5)
+        else:
+            raise ValueError(f"Unknown watcher backend: {backend}")
+            
+        self.logger.info("Using %s file watcher backend", backend)
+        return observer
+    
     def start(self) -> None:
-        """Start watching directory."""
+        """Start watching directory.
+        
+        Must be called from a coroutine running on the watcher's event loop.
+        """
         watch_dir = self.config["paths"]["telegram_download_dir"]
+        self._loop = asyncio.get_running_loop()
+        max_concurrent = self.config.get("watcher", {}).get("max_concurrent")
+        self.event_handler = MediaFileHandler(self.categorizer, self._loop, max_concurrent)
+        self.event_handler.start()
         self.observer.schedule(self.event_handler, watch_dir, recursive=False)
         self.observer.start()
         self._running = True
-        self.logger.info(f"Started watching directory: {watch_dir}")
+        self.logger.info("Started watching directory: %s", watch_dir)
         
     async def stop(self) -> None:
         """Stop watching directory."""
         self.logger.info("Stopping file watcher")
         self._running = False
         # Stop accepting new files first
-        await self.event_handler.stop()
-        # Then stop the observer
-        self.observer.stop()
-        self.observer.join(timeout=5)
+        if self.event_handler is not None:
+            await self.event_handler.stop()
+        # Then stop the observer without blocking the event loop on its thread
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.observer.stop)
+        await loop.run_in_executor(None, functools.partial(self.observer.join, 5))
         self.logger.info("File watcher stopped")
 
     async def _handle_media_file(self, file_path: str) -> None:
@@ -203,8 +321,8 @@ class MediaWatcher:
             file_path: Path to the media file
         """
         try:
-            if not os.path.exists(file_path):
-                self.logger.error(f"File not found: {file_path}")
+            if not await asyncio.to_thread(os.path.exists, file_path):
+                self.logger.error("File not found: %s", file_path)
                 await self.notification.notify(
                     f"❌ Error: File not found\nFile: {os.path.basename(file_path)}\n"
                     "This could be due to:\n• File was moved or deleted\n• Insufficient permissions",
@@ -217,7 +335,7 @@ class MediaWatcher:
                 await self.categorizer.move_to_unmatched(file_path)
 
         except Exception as e:
-            self.logger.error(f"Error processing file {file_path}: {e}", exc_info=True)
+            self.logger.error("Error processing file %s: %s", file_path, e, exc_info=True)
             await self.notification.notify(
                 f"❌ Error processing file: {os.path.basename(file_path)}\n{str(e)}",
                 level="error"
@@ -227,8 +345,13 @@ class MediaWatcher:
     async def process_existing_files(self) -> None:
         """Process any existing files in the watch directory."""
         watch_dir = self.config["paths"]["telegram_download_dir"]
-        for root, _, files in os.walk(watch_dir):
-            for file in files:
-                if not self._running:
-                    break
-                await self._handle_media_file(os.path.join(root, file))
\ No newline at end of file
+        for file_path in await asyncio.to_thread(self._list_files, watch_dir):
+            if not self._running:
+                break
+            await self._handle_media_file(file_path)
+            
+    @staticmethod
+    def _list_files(directory: str) -> List[str]:
+        """List the paths of the regular files in a directory."""
+        with os.scandir(directory) as entries:
+            return [entry.path for entry in entries if entry.is_file(follow_symlinks=False)]
\ No newline at end of file
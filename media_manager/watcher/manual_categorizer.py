@@ -1,15 +1,137 @@
 """Manual categorization handler for unmatched media files."""
 import os
+import re
 import asyncio
+import functools
 import logging
 import time
-from typing import Dict, Any, Optional, List, Tuple
-from common.notification_service import NotificationService
-from watcher.categorizer import MediaCategorizer
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Deque, Dict, Any, Optional, List, Tuple
+from media_manager.common.notification_service import NotificationService
+from media_manager.watcher.categorizer import MediaCategorizer
+
+# Whole-number field in a manually entered reply
+_INT_RE = re.compile(r"\s*(\d{1,9})\s*")
+
+# Separators and stray punctuation dropped from a title for the loosened search
+_TITLE_NOISE_RE = re.compile(r"[\s._\-:,!?]+")
+
+# Apostrophes are removed rather than spaced out, so "Schindler's" stays one word
+_APOSTROPHE_TABLE = str.maketrans("", "", "'\u2019")
+
+# File size units, each 1024 times the previous one
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
+# Reply to the content type prompt -> media type
+_TYPE_MAP: Dict[str, str] = {"1": "movie", "2": "tv"}
+
+# Message templates
+_TYPE_PROMPT = (
+    "📂 Manual Categorization\n\n"
+    "File: {filename}\n\n"
+    "Please select the content type:\n"
+    "1️⃣ Movie\n"
+    "2️⃣ TV Show\n\n"
+    "Reply with 1 for Movie or 2 for TV Show\n"
+    "Or use /skip to skip this file"
+)
+_INVALID_SELECTION = (
+    "❌ Invalid Selection\n\n"
+    "Please reply with:\n"
+    "1️⃣ for Movie\n"
+    "2️⃣ for TV Show\n\n"
+    "Or use /skip to skip this file"
+)
+_MOVIE_PROMPT = (
+    "🎬 Movie Selected: {filename}\n\n"
+    "Please provide the movie information in this format:\n"
+    "Title (Year)\n\n"
+    "Examples:\n"
+    "• The Matrix (1999)\n"
+    "• Inception (2010)"
+)
+_TV_SHOW_PROMPT = (
+    "📺 TV Show Selected: {filename}\n\n"
+    "Please provide the show information in this format:\n"
+    "Show Name | Season | Episode\n\n"
+    "Examples:\n"
+    "• Breaking Bad | 1 | 5\n"
+    "• The Office | 3 | 12"
+)
+_MOVIE_NOT_FOUND = (
+    "❌ Movie Not Found\n\n"
+    "Could not find: {title} ({year})\n\n"
+    "SUGGESTIONS:\n"
+    "1️⃣ Check the spelling\n"
+    "2️⃣ Try alternative titles\n"
+    "3️⃣ Verify the release year\n\n"
+    "Please try again with correct information"
+)
+_TV_SHOW_NOT_FOUND = (
+    "❌ TV Show Not Found\n\n"
+    "Could not find: {show}\n\n"
+    "SUGGESTIONS:\n"
+    "1️⃣ Check the spelling\n"
+    "2️⃣ Try alternative titles\n"
+    "3️⃣ Use the official show name\n\n"
+    "Please try again with correct information"
+)
+_SKIPPED = (
+    "⏭️ Skipped: {filename}\n\n"
+    "The file will remain in the unmatched folder.\n"
+    "Use /categorize to try again later."
+)
+
+def _reports_errors(action: str):
+    """Report any exception from a command handler back to the user.
+    
+    Args:
+        action: What the handler was doing, e.g. "Processing Movie"
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            try:
+                return await func(self, *args, **kwargs)
+            except Exception as e:
+                self.logger.error(f"Error {action.lower()}: {e}", exc_info=True)
+                await self.notification.notify(
+                    f"❌ Error {action}\n\n"
+                    f"Error: {str(e)}\n\n"
+                    f"Please try again or use /skip to skip this file",
+                    level="error"
+                )
+        return wrapper
+    return decorator
+
+@dataclass(slots=True)
+class Session:
+    """State of the file currently being categorized."""
+    
+    path: str
+    stage: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    attempts: int = 0
+    basename: str = field(init=False)
+    
+    def __post_init__(self) -> None:
+        self.basename = os.path.basename(self.path)
 
 class ManualCategorizer:
     """Handles manual categorization of media files."""
     
+    # Number of files shown by /list
+    LIST_LIMIT = 10
+    
+    # Invalid replies accepted per prompt before the session is abandoned
+    MAX_ATTEMPTS = 3
+    
+    # All session state is only touched from command handlers on the event
+    # loop, and no handler awaits between reading and updating it, so it
+    # needs no lock.
+    
     def __init__(self, config: Dict[str, Any], notification_service: NotificationService, 
                  media_categorizer: MediaCategorizer):
         """
@@ -24,25 +146,68 @@ class ManualCategorizer:
         self.notification = notification_service
         self.categorizer = media_categorizer
         self.logger = logging.getLogger("ManualCategorizer")
+        self._unmatched_dir = os.fspath(self.config["paths"]["unmatched_dir"])
+        
+        # Follow-up prompt for each media type in _TYPE_MAP
+        self._detail_prompts = {
+            "movie": self._prompt_movie_details,
+            "tv": self._prompt_tv_show_details,
+        }
         
-        # Track active categorization sessions
-        self._active_sessions: Dict[str, Dict[str, Any]] = {}
-        self._session_lock = asyncio.Lock()
+        # Only one file is categorized at a time
+        self._current: Optional[Session] = None
+        
+        # Files still to be offered in this batch; the head is the current one
+        self._pending: Deque[str] = deque()
+        # (directory mtime_ns, file list) from the last unmatched scan
+        self._unmatched_cache: Optional[Tuple[int, List[os.DirEntry]]] = None
         
         # Register commands
         self._register_commands()
         
     def _register_commands(self) -> None:
         """Register command handlers."""
-        asyncio.create_task(self.notification.register_command("categorize", self._handle_categorize))
-        asyncio.create_task(self.notification.register_command("skip", self._handle_skip))
-        asyncio.create_task(self.notification.register_command("list", self._handle_list))
+        self.notification.register_command("categorize", self._handle_categorize)
+        self.notification.register_command("skip", self._handle_skip)
+        self.notification.register_command("list", self._handle_list)
+        
+    async def _get_unmatched_files(self) -> List[os.DirEntry]:
+        """Get files waiting in the unmatched directory, sorted by name.
         
+        The listing is cached against the directory's mtime, so repeated
+        commands cost a single stat while nothing is added or removed. The
+        stat, and the scan on a cache miss, run in a worker thread, since the
+        directory may live on a slow network mount. The entries keep their
+        own stat cache, so sizes are only read once per listing. Callers must
+        not modify the returned list.
+        """
+        try:
+            mtime = (await asyncio.to_thread(os.stat, self._unmatched_dir)).st_mtime_ns
+        except FileNotFoundError:
+            self._unmatched_cache = None
+            return []
+        if self._unmatched_cache and self._unmatched_cache[0] == mtime:
+            return self._unmatched_cache[1]
+            
+        files = await asyncio.to_thread(self._scan_unmatched_dir, self._unmatched_dir)
+        self._unmatched_cache = (mtime, files)
+        return files
+        
+    @staticmethod
+    def _scan_unmatched_dir(unmatched_dir: str) -> List[os.DirEntry]:
+        """List the regular files in the unmatched directory."""
+        with os.scandir(unmatched_dir) as entries:
+            files = [entry for entry in entries if entry.is_file(follow_symlinks=False)]
+        files.sort(key=lambda entry: entry.name)
+        return files
+        
+    @_reports_errors("Starting Categorization")
     async def _handle_categorize(self, message: Any) -> None:
         """Handle /categorize command."""
-        unmatched_files = self._get_unmatched_files()
+        if not self._pending:
+            self._pending.extend(entry.path for entry in await self._get_unmatched_files())
         
-        if not unmatched_files:
+        if not self._pending:
             await self.notification.notify(
                 "✅ No Files Need Categorization!\n\n"
                 "All files have been processed and organized.\n"
@@ -52,144 +217,233 @@ class ManualCategorizer:
             return
             
         # Get next file to categorize
-        file_path = unmatched_files[0]
+        file_path = self._pending[0]
         await self._start_categorization(file_path)
 
     async def _start_categorization(self, file_path: str) -> None:
         """Start categorization session for a file."""
-        filename = os.path.basename(file_path)
+        self._current = Session(path=file_path, stage="type")
+        filename = self._current.basename
         
         # First, display file info and options
-        await self.notification.notify(
-            f"📂 Manual Categorization\n\n"
-            f"File: {filename}\n\n"
-            f"Please select the content type:\n"
-            f"1️⃣ Movie\n"
-            f"2️⃣ TV Show\n\n"
-            f"Reply with 1 for Movie or 2 for TV Show\n"
-            f"Or use /skip to skip this file",
-            level="info"
-        )
+        await self.notification.notify(_TYPE_PROMPT.format(filename=filename), level="info")
+
+    def _session_for(self, file_path: str) -> Optional[Session]:
+        """Get the current session if it belongs to the given file."""
+        if self._current is not None and self._current.path == file_path:
+            return self._current
+        return None
 
+    @_reports_errors("Selecting Content Type")
     async def _handle_type_response(self, file_path: str, response: str) -> None:
         """Handle content type response."""
-        filename = os.path.basename(file_path)
+        session = self._session_for(file_path)
+        filename = session.basename if session is not None else os.path.basename(file_path)
         
-        if response == "1":  # Movie
-            await self.notification.notify(
-                f"🎬 Movie Selected: {filename}\n\n"
-                f"Please provide the movie information in this format:\n"
-                f"Title (Year)\n\n"
-                f"Examples:\n"
-                f"• The Matrix (1999)\n"
-                f"• Inception (2010)",
-                level="info"
-            )
+        media_type = _TYPE_MAP.get(response)
+        if media_type is None:
+            if session is not None and await self._give_up_after_attempts(session):
+                return
+            await self.notification.notify(_INVALID_SELECTION, level="warning")
+            return
             
-        elif response == "2":  # TV Show
-            await self.notification.notify(
-                f"📺 TV Show Selected: {filename}\n\n"
-                f"Please provide the show information in this format:\n"
-                f"Show Name | Season | Episode\n\n"
-                f"Examples:\n"
-                f"• Breaking Bad | 1 | 5\n"
-                f"• The Office | 3 | 12",
-                level="info"
-            )
-        else:
-            await self.notification.notify(
-                f"❌ Invalid Selection\n\n"
-                f"Please reply with:\n"
-                f"1️⃣ for Movie\n"
-                f"2️⃣ for TV Show\n\n"
-                f"Or use /skip to skip this file",
-                level="warning"
-            )
+        if session is not None:
+            session.stage = "details"
+            session.attempts = 0
+            session.metadata["type"] = media_type
+        await self._detail_prompts[media_type](filename)
 
-    async def _process_movie_input(self, file_path: str, title: str, year: str) -> None:
-        """Process movie information input."""
-        try:
-            # Search TMDB
-            movie_info = await self.categorizer.tmdb.search_movie(title, year)
-            if not movie_info:
-                await self.notification.notify(
-                    f"❌ Movie Not Found\n\n"
-                    f"Could not find: {title} ({year})\n\n"
-                    f"SUGGESTIONS:\n"
-                    f"1️⃣ Check the spelling\n"
-                    f"2️⃣ Try alternative titles\n"
-                    f"3️⃣ Verify the release year\n\n"
-                    f"Please try again with correct information",
-                    level="warning"
+    async def _prompt_movie_details(self, filename: str) -> None:
+        """Ask for the movie title and year."""
+        await self.notification.notify(_MOVIE_PROMPT.format(filename=filename), level="info")
+        
+    async def _prompt_tv_show_details(self, filename: str) -> None:
+        """Ask for the show name, season and episode."""
+        await self.notification.notify(_TV_SHOW_PROMPT.format(filename=filename), level="info")
+
+    @_reports_errors("Reading Details")
+    async def _handle_details_response(self, file_path: str, response: str) -> None:
+        """Handle the one-line details reply for the selected content type."""
+        session = self._session_for(file_path)
+        if session is None or session.stage != "details":
+            return
+            
+        errors = []
+        if session.metadata["type"] == "movie":
+            # "Title (Year)"
+            title, _, year = response.rpartition("(")
+            title = title.strip()
+            year = year.strip().rstrip(")").strip()
+            if not title:
+                errors.append("Title is missing")
+            year_value = self._parse_bounded_int(year, 1900, 2100)
+            if year_value is None:
+                errors.append(f"Invalid year: {year or '(missing)'}")
+            else:
+                year = str(year_value)
+            if errors:
+                await self._notify_invalid_details(session, errors, "Title (Year)")
+                return
+            await self._process_movie_input(file_path, title, year)
+            
+        else:
+            # "Show Name | Season | Episode"
+            parts = response.split("|")
+            if len(parts) != 3:
+                await self._notify_invalid_details(
+                    session,
+                    ["Expected three fields separated by |"],
+                    "Show Name | Season | Episode"
                 )
                 return
+            show, season, episode = (part.strip() for part in parts)
+            if not show:
+                errors.append("Show name is missing")
+            numbers = {}
+            for name, value in (("Season", season), ("Episode", episode)):
+                number = self._parse_bounded_int(value, 1)
+                if number is None:
+                    errors.append(f"Invalid {name.lower()}: {value or '(missing)'}")
+                else:
+                    numbers[name] = number
+            if errors:
+                await self._notify_invalid_details(session, errors, "Show Name | Season | Episode")
+                return
+            await self._process_tv_show_input(file_path, show, numbers["Season"], numbers["Episode"])
 
-            # Show movie details for confirmation
-            await self.notification.notify(
-                f"🎬 Movie Found!\n\n"
-                f"Title: {movie_info['title']}\n"
-                f"Year: {movie_info['release_date'][:4]}\n"
-                f"Rating: {movie_info.get('vote_average', 'N/A')}/10\n"
-                f"Overview: {movie_info.get('overview', 'No overview available.')[:200]}...\n\n"
-                f"Is this correct? Reply with:\n"
-                f"👍 YES - to confirm and move the file\n"
-                f"👎 NO - to try again with different info",
-                level="info"
-            )
+    @staticmethod
+    def _parse_bounded_int(value: str, lo: int, hi: int = 10**9) -> Optional[int]:
+        """Parse a whole number within [lo, hi], or return None."""
+        match = _INT_RE.fullmatch(value)
+        if not match:
+            return None
+        number = int(match.group(1))
+        return number if lo <= number <= hi else None
+
+    async def _notify_invalid_details(self, session: Session, errors: List[str],
+                                      expected_format: str) -> None:
+        """Report every problem with a details reply at once."""
+        if await self._give_up_after_attempts(session):
+            return
+        problems = "\n".join(f"• {error}" for error in errors)
+        await self.notification.notify(
+            f"❌ Invalid Details\n\n"
+            f"{problems}\n\n"
+            f"Please reply in this format:\n"
+            f"{expected_format}\n\n"
+            f"Or use /skip to skip this file",
+            level="warning"
+        )
+
+    async def _give_up_after_attempts(self, session: Session) -> bool:
+        """Count an invalid reply, ending the session once attempts run out.
+        
+        Returns:
+            True if the session was abandoned
+        """
+        session.attempts += 1
+        if session.attempts < self.MAX_ATTEMPTS:
+            return False
+        self._current = None
+        await self.notification.notify(
+            f"❌ Too Many Invalid Replies\n\n"
+            f"Stopped categorizing {session.basename}.\n"
+            f"Use /categorize to start again.",
+            level="warning"
+        )
+        return True
 
-        except Exception as e:
+    @_reports_errors("Processing Movie")
+    async def _process_movie_input(self, file_path: str, title: str, year: str) -> None:
+        """Process movie information input."""
+        movie_info = await self._search_movie_variants(title, year)
+        # The file may have been skipped while TMDB was searched
+        session = self._session_for(file_path)
+        if session is None:
+            return
+        if not movie_info:
             await self.notification.notify(
-                f"❌ Error Processing Movie\n\n"
-                f"Error: {str(e)}\n\n"
-                f"Please try again or use /skip to skip this file",
-                level="error"
+                _MOVIE_NOT_FOUND.format(title=title, year=year),
+                level="warning"
             )
+            return
+
+        session.stage = "confirm"
+        session.metadata.update(movie_info)
+            
+        # Show movie details for confirmation
+        await self.notification.notify(
+            f"🎬 Movie Found!\n\n"
+            f"Title: {movie_info['title']}\n"
+            f"Year: {movie_info['release_date'][:4]}\n"
+            f"Rating: {movie_info.get('vote_average', 'N/A')}/10\n"
+            f"Overview: {movie_info.get('overview', 'No overview available.')[:200]}...\n\n"
+            f"Is this correct? Reply with:\n"
+            f"👍 YES - to confirm and move the file\n"
+            f"👎 NO - to try again with different info",
+            level="info"
+        )
 
+    async def _search_movie_variants(self, title: str, year: str) -> Optional[Dict[str, Any]]:
+        """Search TMDB for a movie, trying loosened queries at the same time.
+        
+        The exact title and year, the title without the year and a cleaned-up
+        title are searched concurrently, and the first of those (in that order)
+        that finds something wins. Identical requests are shared by the client.
+        """
+        candidates = [(title, year), (title, None)]
+        cleaned = _TITLE_NOISE_RE.sub(" ", title.translate(_APOSTROPHE_TABLE)).strip()
+        if cleaned and cleaned != title:
+            candidates.append((cleaned, year))
+        search = self.categorizer.tmdb.search_movie
+        results = await asyncio.gather(
+            *(search(*candidate) for candidate in candidates),
+            return_exceptions=True
+        )
+        for candidate, result in zip(candidates, results):
+            if isinstance(result, BaseException):
+                self.logger.warning("TMDB search for %r failed: %s", candidate, result)
+            elif result:
+                return result
+        return None
+
+    @_reports_errors("Processing TV Show")
     async def _process_tv_show_input(self, file_path: str, show: str, season: int, episode: int) -> None:
         """Process TV show information input."""
-        try:
-            # Search TMDB
-            show_info = await self.categorizer.tmdb.search_tv_show(show)
-            if not show_info:
-                await self.notification.notify(
-                    f"❌ TV Show Not Found\n\n"
-                    f"Could not find: {show}\n\n"
-                    f"SUGGESTIONS:\n"
-                    f"1️⃣ Check the spelling\n"
-                    f"2️⃣ Try alternative titles\n"
-                    f"3️⃣ Use the official show name\n\n"
-                    f"Please try again with correct information",
-                    level="warning"
-                )
-                return
-
-            # Show TV show details for confirmation
-            await self.notification.notify(
-                f"📺 TV Show Found!\n\n"
-                f"Show: {show_info['name']}\n"
-                f"First Aired: {show_info.get('first_air_date', 'Unknown')[:4]}\n"
-                f"Season: {season}\n"
-                f"Episode: {episode}\n"
-                f"Rating: {show_info.get('vote_average', 'N/A')}/10\n"
-                f"Overview: {show_info.get('overview', 'No overview available.')[:200]}...\n\n"
-                f"Is this correct? Reply with:\n"
-                f"👍 YES - to confirm and move the file\n"
-                f"👎 NO - to try again with different info",
-                level="info"
-            )
+        # Search TMDB
+        show_info = await self.categorizer.tmdb.search_tv_show(show)
+        # The file may have been skipped while TMDB was searched
+        session = self._session_for(file_path)
+        if session is None:
+            return
+        if not show_info:
+            await self.notification.notify(_TV_SHOW_NOT_FOUND.format(show=show), level="warning")
+            return
 
-        except Exception as e:
-            await self.notification.notify(
-                f"❌ Error Processing TV Show\n\n"
-                f"Error: {str(e)}\n\n"
-                f"Please try again or use /skip to skip this file",
-                level="error"
-            )
+        session.stage = "confirm"
+        session.metadata.update(show_info, season=season, episode=episode)
+            
+        # Show TV show details for confirmation
+        await self.notification.notify(
+            f"📺 TV Show Found!\n\n"
+            f"Show: {show_info['name']}\n"
+            f"First Aired: {show_info.get('first_air_date', 'Unknown')[:4]}\n"
+            f"Season: {season}\n"
+            f"Episode: {episode}\n"
+            f"Rating: {show_info.get('vote_average', 'N/A')}/10\n"
+            f"Overview: {show_info.get('overview', 'No overview available.')[:200]}...\n\n"
+            f"Is this correct? Reply with:\n"
+            f"👍 YES - to confirm and move the file\n"
+            f"👎 NO - to try again with different info",
+            level="info"
+        )
 
+    @_reports_errors("Skipping File")
     async def _handle_skip(self, message: Any) -> None:
         """Handle /skip command."""
-        unmatched_files = self._get_unmatched_files()
-        if not unmatched_files:
+        if not self._pending:
+            self._pending.extend(entry.path for entry in await self._get_unmatched_files())
+        if not self._pending:
             await self.notification.notify(
                 "✅ No Files Need Categorization!\n\n"
                 "All files have been processed and organized.",
@@ -197,24 +451,22 @@ class ManualCategorizer:
             )
             return
 
-        current_file = unmatched_files[0]
-        filename = os.path.basename(current_file)
+        current_file = self._pending.popleft()
+        session = self._session_for(current_file)
+        filename = session.basename if session is not None else os.path.basename(current_file)
+        self._current = None
         
         # Skip current file
-        await self.notification.notify(
-            f"⏭️ Skipped: {filename}\n\n"
-            f"The file will remain in the unmatched folder.\n"
-            f"Use /categorize to try again later.",
-            level="info"
-        )
+        await self.notification.notify(_SKIPPED.format(filename=filename), level="info")
         
         # Move to next file if available
-        if len(unmatched_files) > 1:
-            await self._start_categorization(unmatched_files[1])
+        if self._pending:
+            await self._start_categorization(self._pending[0])
 
+    @_reports_errors("Listing Files")
     async def _handle_list(self, message: Any) -> None:
         """Handle /list command."""
-        unmatched_files = self._get_unmatched_files()
+        unmatched_files = await self._get_unmatched_files()
         
         if not unmatched_files:
             await self.notification.notify(
@@ -224,13 +476,20 @@ class ManualCategorizer:
             )
             return
             
-        # Format list with numbers and file sizes
+        # Format the first few files with numbers and sizes. DirEntry caches
+        # its stat, so only the first /list after a rescan touches the disk,
+        # and that happens off the event loop.
+        shown = list(islice(unmatched_files, self.LIST_LIMIT))
+        sizes = await asyncio.to_thread(
+            lambda: [entry.stat(follow_symlinks=False).st_size for entry in shown]
+        )
         file_list = []
-        for i, file_path in enumerate(unmatched_files, 1):
-            filename = os.path.basename(file_path)
-            size = os.path.getsize(file_path)
+        for i, (entry, size) in enumerate(zip(shown, sizes), 1):
             size_str = self._format_size(size)
-            file_list.append(f"{i}. {filename} ({size_str})")
+            file_list.append(f"{i}. {entry.name} ({size_str})")
+        remaining = len(unmatched_files) - len(file_list)
+        if remaining > 0:
+            file_list.append(f"...and {remaining} more")
 
         await self.notification.notify(
             f"📋 Unmatched Files ({len(unmatched_files)}):\n\n"
@@ -242,8 +501,6 @@ class ManualCategorizer:
 
     def _format_size(self, size_bytes: int) -> str:
         """Format file size in human readable format."""
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if size_bytes < 1024:
-                return f"{size_bytes:.1f} {unit}"
-            size_bytes /= 1024
-        return f"{size_bytes:.1f} TB"
\ No newline at end of file
+        # Every 10 bits is one unit step
+        idx = min(max(0, (size_bytes.bit_length() - 1) // 10), len(_SIZE_UNITS) - 1)
+        return f"{size_bytes / (1 << (idx * 10)):.1f} {_SIZE_UNITS[idx]}"
\ No newline at end of file
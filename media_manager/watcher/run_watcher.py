@@ -3,7 +3,6 @@ import asyncio
 import os
 import sys
 import signal
-from typing import Any
 import logging
 
 # Add parent directory to path for imports
@@ -29,34 +28,34 @@ async def main() -> None:
     # Initialize watcher
     watcher = MediaWatcher(config, notification)
     
-    def handle_shutdown(signum: int, frame: Any) -> None:
+    loop = asyncio.get_running_loop()
+    stop_event = asyncio.Event()
+    
+    def handle_shutdown() -> None:
         """Handle shutdown signals."""
         logger.info("Shutdown signal received")
-        watcher.stop()
-        asyncio.get_event_loop().stop()
+        stop_event.set()
         
-    # Set up signal handlers
+    # Set up signal handlers; these run as normal loop callbacks
     for sig in (signal.SIGTERM, signal.SIGINT):
-        signal.signal(sig, handle_shutdown)
+        loop.add_signal_handler(sig, handle_shutdown)
     
     try:
-        # Ensure required directories exist
-        for path in config["paths"].values():
-            os.makedirs(path, exist_ok=True)
+        # Ensure required directories exist, without blocking the loop on
+        # slow (e.g. network) mounts
+        await asyncio.gather(*(
+            asyncio.to_thread(os.makedirs, path, exist_ok=True)
+            for path in config["paths"].values()
+        ))
         
-        # Start watcher
+        # Start watcher and run until asked to stop
         watcher.start()
-        
-        # Run event loop
-        loop = asyncio.get_event_loop()
-        loop.run_forever()
+        await stop_event.wait()
         
     except Exception as e:
         logger.error(f"Error running watcher: {e}")
-        watcher.stop()
     finally:
-        loop = asyncio.get_event_loop()
-        loop.close()
+        await watcher.stop()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -1,14 +1,54 @@
 """TMDB API client module."""
 import logging
-from typing import Dict, Any, Optional
+import random
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Dict, Any, Final, Optional, Tuple
 import aiohttp
 import asyncio
-from urllib.parse import quote
+import orjson
+from media_manager.common.rate_limiters import AsyncTokenBucket
+
+# Named to match the logger levels configured in logger_setup
+_LOG = logging.getLogger("TMDBClient")
+
+# Dots in release names separate words
+_DOT_TABLE = str.maketrans({'.': ' '})
+
+# Parameters shared by every search request; the API key is added in _fetch
+_SEARCH_PARAMS = MappingProxyType({
+    'include_adult': 'false',
+    'language': 'en-US',
+    'page': 1
+})
+
+# Fields a movie search result needs to be usable
+_REQUIRED_MOVIE_KEYS = frozenset({'id', 'title', 'release_date'})
+
+# Returned by _fetch for a 404 so misses can be cached separately from errors
+_NOT_FOUND: Final = object()
 
 class TMDBClient:
     """Client for The Movie Database (TMDB) API."""
     
-    BASE_URL = "https://api.themoviedb.org/3"
+    BASE_URL: Final = "https://api.themoviedb.org/3"
+    
+    # Successful responses are reused for this long (seconds)
+    CACHE_TTL: Final = 24 * 60 * 60
+    # Lookups TMDB had nothing for are remembered for a shorter time
+    NOT_FOUND_TTL: Final = 60 * 60
+    CACHE_SIZE: Final = 4096
+    # Upper bound on a single request, including connecting (seconds)
+    REQUEST_TIMEOUT: Final = 10
+    # TMDB allows about 40 requests every 10 seconds
+    RATE_LIMIT: Final = (40, 10)
+    # Requests allowed on the wire at once
+    MAX_CONCURRENT: Final = 10
+    # Attempts for a request that keeps getting 429 or 5xx responses, and
+    # the cap on the backoff between them (seconds)
+    MAX_ATTEMPTS: Final = 5
+    MAX_BACKOFF: Final = 60
     
     def __init__(self, api_key: str):
         """
@@ -18,159 +58,274 @@ class TMDBClient:
             api_key: TMDB API key
         """
         self.api_key = api_key
-        self.logger = logging.getLogger("TMDBClient")
         self._session: Optional[aiohttp.ClientSession] = None
         self._lock = asyncio.Lock()
+        self._sem = asyncio.Semaphore(self.MAX_CONCURRENT)
         self._rate_limit_remaining = 40
-        self._rate_limit_reset = 0
+        # When TMDB's rate limit window resets, on the monotonic clock
+        self._rate_limit_reset_at = 0.0
+        # Paces requests below TMDB's limit instead of waiting for 429s
+        self._limiter = AsyncTokenBucket(*self.RATE_LIMIT)
+        # (endpoint, sorted params) -> (expiry on the monotonic clock, response),
+        # in LRU order; a None response records a 404
+        self._cache: "OrderedDict[Tuple, Tuple[float, Optional[Dict[str, Any]]]]" = OrderedDict()
+        # Requests currently on the wire, keyed like the cache
+        self._inflight: Dict[Tuple, asyncio.Task] = {}
+        
+    async def __aenter__(self) -> "TMDBClient":
+        """Open the client for use as an async context manager."""
+        await self._get_session()
+        return self
+        
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        """Close the session when leaving the context."""
+        await self.close()
         
     async def _get_session(self) -> aiohttp.ClientSession:
-        """Get or create an aiohttp session."""
-        if not self._session:
-            self._session = aiohttp.ClientSession()
+        """Get or create the shared aiohttp session.
+        
+        One session is kept for the client's lifetime so requests reuse
+        keep-alive connections and cached DNS lookups.
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=20, limit_per_host=self.MAX_CONCURRENT,
+                ttl_dns_cache=300, keepalive_timeout=60
+            )
+            timeout = aiohttp.ClientTimeout(total=self.REQUEST_TIMEOUT)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
         return self._session
         
-    async def _make_request(self, endpoint: str, params: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+    async def _make_request(self, endpoint: str, params: Dict[str, Any] = None,
+                            bypass_cache: bool = False) -> Optional[Dict[str, Any]]:
         """
-        Make a request to TMDB API with rate limiting.
+        Make a request to TMDB API with rate limiting and caching.
         
         Args:
             endpoint: API endpoint
             params: Query parameters
+            bypass_cache: Skip the response cache and always ask TMDB
             
         Returns:
             Response JSON or None if request failed
         """
-        if not params:
-            params = {}
-        params['api_key'] = self.api_key
+        params = dict(params) if params else {}
+        key = self._request_key(endpoint, params)
+        if not bypass_cache:
+            cached = self._cache.get(key)
+            if cached is not None:
+                if cached[0] > time.monotonic():
+                    self._cache.move_to_end(key)
+                    return cached[1]
+                del self._cache[key]
+                
+        # Share one fetch between concurrent identical requests
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch_and_cache(key, endpoint, params))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so one caller being cancelled doesn't cancel the others
+        return await asyncio.shield(task)
         
-        url = f"{self.BASE_URL}/{endpoint}"
+    @staticmethod
+    def _request_key(endpoint: str, params: Dict[str, Any]) -> Tuple:
+        """Build the cache/in-flight key for a request."""
+        return (endpoint, tuple(sorted(params.items())))
         
-        async with self._lock:
-            if self._rate_limit_remaining <= 0:
-                wait_time = max(0, self._rate_limit_reset - asyncio.get_event_loop().time())
-                if wait_time > 0:
-                    self.logger.warning(f"Rate limit reached, waiting {wait_time:.1f}s")
-                    await asyncio.sleep(wait_time)
+    async def _fetch_and_cache(self, key: Tuple, endpoint: str,
+                               params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Fetch an endpoint and cache a successful or not-found response."""
+        result = await self._fetch(endpoint, params)
+        if result is _NOT_FOUND:
+            self._store(key, None, self.NOT_FOUND_TTL)
+            return None
+        if result is not None:
+            self._store(key, result, self.CACHE_TTL)
+        return result
         
-        try:
-            session = await self._get_session()
-            async with session.get(url, params=params) as response:
-                # Update rate limits
-                self._rate_limit_remaining = int(response.headers.get('X-RateLimit-Remaining', 40))
-                self._rate_limit_reset = float(response.headers.get('X-RateLimit-Reset', 0))
-                
-                if response.status == 429:  # Too Many Requests
-                    retry_after = int(response.headers.get('Retry-After', 1))
-                    self.logger.warning(f"Rate limit exceeded, waiting {retry_after}s")
-                    await asyncio.sleep(retry_after)
-                    return await self._make_request(endpoint, params)
-                    
-                if response.status == 404:
-                    return None
-                    
-                if response.status != 200:
-                    error_json = await response.json()
-                    error_msg = error_json.get('status_message', 'Unknown error')
-                    self.logger.error(f"TMDB API error ({response.status}): {error_msg}")
-                    return None
+    def _store(self, key: Tuple, result: Optional[Dict[str, Any]], ttl: float) -> None:
+        """Cache a response, evicting the least recently used ones."""
+        self._cache[key] = (time.monotonic() + ttl, result)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.CACHE_SIZE:
+            self._cache.popitem(last=False)
+        
+    async def _fetch(self, endpoint: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Fetch an endpoint from TMDB, honouring its rate limits.
+        
+        Args:
+            endpoint: API endpoint
+            params: Query parameters, without the API key
+            
+        Returns:
+            Response JSON, _NOT_FOUND for a 404, or None if request failed
+        """
+        query = {**params, 'api_key': self.api_key}
+        
+        url = f"{self.BASE_URL}/{endpoint}"
+        
+        for attempt in range(self.MAX_ATTEMPTS):
+            # Set to the wait TMDB asks for when the response is worth retrying
+            retry_after = None
+            
+            async with self._lock:
+                if self._rate_limit_remaining <= 0:
+                    wait_time = self._rate_limit_reset_at - time.monotonic()
+                    if wait_time > 0:
+                        _LOG.warning("Rate limit reached, waiting %.1fs", wait_time)
+                        await asyncio.sleep(wait_time)
+            
+            try:
+                session = await self._get_session()
+                await self._limiter.acquire()
+                # Bounds the fan-out when many files are categorized at once
+                async with self._sem:
+                    async with session.get(url, params=query) as response:
+                        # Update rate limits; the reset header is a Unix timestamp
+                        remaining = response.headers.get('X-RateLimit-Remaining')
+                        if remaining is not None:
+                            self._rate_limit_remaining = int(remaining)
+                            reset = response.headers.get('X-RateLimit-Reset')
+                            if reset is not None:
+                                self._rate_limit_reset_at = (
+                                    time.monotonic() + max(0.0, float(reset) - time.time())
+                                )
+                        
+                        status = response.status
+                        if status == 429:  # Too Many Requests
+                            retry_after = int(response.headers.get('Retry-After', 1))
+                            
+                        elif status >= 500:
+                            retry_after = 0
+                            
+                        elif status == 404:
+                            return _NOT_FOUND
+                            
+                        elif status != 200:
+                            # Only read the error body when it will actually be logged
+                            if _LOG.isEnabledFor(logging.ERROR):
+                                error_json = await response.json(loads=orjson.loads)
+                                error_msg = error_json.get('status_message', 'Unknown error')
+                                _LOG.error("TMDB API error (%s): %s", response.status, error_msg)
+                            return None
+                            
+                        else:
+                            return await response.json(loads=orjson.loads)
                     
-                return await response.json()
+            except aiohttp.ClientError as e:
+                _LOG.error("Network error accessing TMDB: %s", e)
+                return None
+            except Exception as e:
+                _LOG.error("Error making TMDB request: %s", e)
+                return None
                 
-        except aiohttp.ClientError as e:
-            self.logger.error(f"Network error accessing TMDB: {str(e)}")
-            return None
-        except Exception as e:
-            self.logger.error(f"Error making TMDB request: {str(e)}")
-            return None
+            # Rate limited or server error; back off outside the semaphore
+            # so other requests aren't held up behind this one
+            if retry_after is not None and attempt + 1 < self.MAX_ATTEMPTS:
+                delay = max(retry_after, min(self.MAX_BACKOFF, 2 ** attempt + random.random()))
+                _LOG.warning("TMDB returned %s, retrying in %.1fs", status, delay)
+                await asyncio.sleep(delay)
+                
+        _LOG.error("Giving up on TMDB request after %d attempts: %s", self.MAX_ATTEMPTS, endpoint)
+        return None
 
-    async def search_movie(self, title: str, year: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    async def search_movie(self, title: str, year: Optional[str] = None,
+                           bypass_cache: bool = False) -> Optional[Dict[str, Any]]:
         """
         Search for a movie.
         
         Args:
             title: Movie title
             year: Release year (optional)
+            bypass_cache: Skip cached responses, e.g. for a manual retry
             
         Returns:
             Movie information or None if not found
         """
-        # Sanitize input
-        query = quote(title)
+        # aiohttp URL-encodes the parameters itself
+        query = title.translate(_DOT_TABLE)
         
         # Build search parameters
-        params = {
-            'query': query,
-            'include_adult': 'false',
-            'language': 'en-US',
-            'page': 1
-        }
+        params = {**_SEARCH_PARAMS, 'query': query}
         if year:
             params['year'] = year
             
         try:
             # Search for movies
-            results = await self._make_request('search/movie', params)
+            results = await self._make_request('search/movie', params, bypass_cache)
             if not results or not results.get('results'):
-                self.logger.info(f"No movies found for '{title}' ({year if year else 'any year'})")
+                _LOG.info("No movies found for '%s' (%s)", title, year or 'any year')
                 return None
                 
-            matches = results['results']
+            # Skip incomplete records
+            matches = [m for m in results['results'] if m.keys() >= _REQUIRED_MOVIE_KEYS]
+            if not matches:
+                _LOG.info("No complete movie results for '%s'", title)
+                return None
             
-            # If year provided, filter exact matches first
-            if year:
-                exact_matches = [
-                    m for m in matches 
-                    if m.get('release_date', '').startswith(year)
-                ]
-                if exact_matches:
-                    matches = exact_matches
+            # An exact title (and year, if given) match wins outright
+            query_lower = query.lower()
+            best_match = next(
+                (m for m in matches
+                 if m['title'].lower() == query_lower
+                 and (not year or (m['release_date'] or '').startswith(year))),
+                None
+            )
             
-            # Get the best match (usually the first result)
-            best_match = matches[0]
+            if best_match is None:
+                # If year provided, filter exact matches first
+                if year:
+                    exact_matches = [
+                        m for m in matches 
+                        if m.get('release_date', '').startswith(year)
+                    ]
+                    if exact_matches:
+                        matches = exact_matches
+                
+                # Get the best match (usually the first result)
+                best_match = matches[0]
             
             # Get full movie details
             movie_id = best_match['id']
-            details = await self._make_request(f'movie/{movie_id}')
+            details = await self._make_request(f'movie/{movie_id}', bypass_cache=bypass_cache)
             
             if details:
-                self.logger.info(
-                    f"Found movie: {details['title']} ({details['release_date'][:4]}) "
-                    f"[{details.get('vote_average', 'N/A')}/10]"
+                _LOG.info(
+                    "Found movie: %s (%s) [%s/10]",
+                    details['title'], details['release_date'][:4], details.get('vote_average', 'N/A')
                 )
                 return details
             
             return best_match
             
         except Exception as e:
-            self.logger.error(f"Error searching for movie '{title}': {str(e)}")
+            _LOG.error("Error searching for movie '%s': %s", title, e)
             return None
 
-    async def search_tv_show(self, title: str) -> Optional[Dict[str, Any]]:
+    async def search_tv_show(self, title: str, bypass_cache: bool = False) -> Optional[Dict[str, Any]]:
         """
         Search for a TV show.
         
         Args:
             title: Show title
+            bypass_cache: Skip cached responses, e.g. for a manual retry
             
         Returns:
             Show information or None if not found
         """
-        # Sanitize input
-        query = quote(title)
+        # aiohttp URL-encodes the parameters itself
+        query = title.translate(_DOT_TABLE)
         
         try:
             # Search for TV shows
-            results = await self._make_request('search/tv', {
-                'query': query,
-                'include_adult': 'false',
-                'language': 'en-US',
-                'page': 1
-            })
+            results = await self._make_request(
+                'search/tv', {**_SEARCH_PARAMS, 'query': query}, bypass_cache
+            )
             
             if not results or not results.get('results'):
-                self.logger.info(f"No TV shows found for '{title}'")
+                _LOG.info("No TV shows found for '%s'", title)
                 return None
             
             # Get the best match
@@ -178,20 +333,20 @@ class TMDBClient:
             
             # Get full show details
             show_id = best_match['id']
-            details = await self._make_request(f'tv/{show_id}')
+            details = await self._make_request(f'tv/{show_id}', bypass_cache=bypass_cache)
             
             if details:
-                self.logger.info(
-                    f"Found TV show: {details['name']} "
-                    f"(First aired: {details.get('first_air_date', 'Unknown')[:4]}) "
-                    f"[{details.get('vote_average', 'N/A')}/10]"
+                _LOG.info(
+                    "Found TV show: %s (First aired: %s) [%s/10]",
+                    details['name'], details.get('first_air_date', 'Unknown')[:4],
+                    details.get('vote_average', 'N/A')
                 )
                 return details
                 
             return best_match
             
         except Exception as e:
-            self.logger.error(f"Error searching for TV show '{title}': {str(e)}")
+            _LOG.error("Error searching for TV show '%s': %s", title, e)
             return None
             
     async def close(self) -> None:
@@ -2,9 +2,15 @@
 """Configuration initialization script for Media Manager."""
 import os
 import json
+from copy import deepcopy
 import click
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib writer on minimal installs
+    orjson = None
+
 CONFIG_TEMPLATE = {
     "paths": {
         "telegram_download_dir": "",
@@ -63,6 +69,15 @@ def validate_numeric_string(ctx, param, value):
         raise click.BadParameter("Must contain only numbers")
     return value
 
+def write_config(config, path):
+    """Write the configuration as indented JSON."""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(config, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(config, f, indent=2, ensure_ascii=False)
+
 @click.command()
 @click.option('--download-dir', prompt='Enter path for downloads directory',
               help='Directory where files will be downloaded',
@@ -106,7 +121,8 @@ TELEGRAM_CHAT_ID={telegram_chat_id}
         click.echo("Created .env file with secrets")
 
         # Create config.json without sensitive data
-        config = CONFIG_TEMPLATE.copy()
+        # Deep copy so the nested sections of the template aren't modified
+        config = deepcopy(CONFIG_TEMPLATE)
         config["paths"]["telegram_download_dir"] = download_dir
         config["paths"]["movies_dir"] = movies_dir
         config["paths"]["tv_shows_dir"] = tv_dir
@@ -121,8 +137,7 @@ TELEGRAM_CHAT_ID={telegram_chat_id}
         config["notification"]["bot_token"] = "${TELEGRAM_BOT_TOKEN}"
         config["notification"]["chat_id"] = "${TELEGRAM_CHAT_ID}"
 
-        with open('config.json', 'w') as f:
-            json.dump(config, f, indent=4)
+        write_config(config, 'config.json')
         click.echo("Created config.json")
 
         click.echo("\nConfiguration completed successfully!")
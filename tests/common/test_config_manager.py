@@ -1,106 +1,106 @@
 """Tests for configuration manager module."""
-import os
-import json
+import orjson
 import pytest
-import tempfile
-from pathlib import Path
-from media_manager.common.config_manager import ConfigManager, DEFAULT_CONFIG
+from unittest import mock
+from media_manager.common.config_manager import ConfigManager
+
+# Environment variables ConfigManager reads secrets from
+SECRET_ENV_VARS = [
+    ("tmdb", "api_key", "TMDB_API_KEY"),
+    ("telegram", "api_id", "TELEGRAM_API_ID"),
+    ("telegram", "api_hash", "TELEGRAM_API_HASH"),
+    ("telegram", "bot_token", "TELEGRAM_BOT_TOKEN"),
+    ("telegram", "chat_id", "TELEGRAM_CHAT_ID"),
+]
+
+BASE_CONFIG = {
+    "paths": {
+        "telegram_download_dir": "downloads",
+        "movies_dir": "media/movies",
+        "tv_shows_dir": "media/tv_shows",
+        "unmatched_dir": "media/unmatched"
+    },
+    "tmdb": {"api_key": "file_tmdb_key"},
+    "telegram": {
+        "api_id": "12345",
+        "api_hash": "file_hash",
+        "bot_token": "file_token",
+        "chat_id": "file_chat"
+    },
+    "logging": {"level": "INFO"}
+}
+
+@pytest.fixture(autouse=True)
+def clean_secret_env(monkeypatch):
+    """Keep secrets from the surrounding environment out of the tests."""
+    for _, _, env_var in SECRET_ENV_VARS:
+        monkeypatch.delenv(env_var, raising=False)
 
 @pytest.fixture
-def temp_config_file():
+def temp_config_file(tmp_path):
     """Create a temporary config file."""
-    with tempfile.NamedTemporaryFile(mode='w', delete=False) as f:
-        json.dump({}, f)
-    yield f.name
-    os.unlink(f.name)
+    path = tmp_path / "config.json"
+    path.write_bytes(orjson.dumps(BASE_CONFIG))
+    return str(path)
 
 def test_load_config(temp_config_file):
     """Test loading configuration from file."""
     manager = ConfigManager(temp_config_file)
-    assert manager.config == DEFAULT_CONFIG
+    assert manager.config == BASE_CONFIG
+    assert manager["logging"]["level"] == "INFO"
+    assert manager.get("tmdb") == {"api_key": "file_tmdb_key"}
+    assert manager.get("missing", "default") == "default"
 
-def test_load_nonexistent_config():
+def test_load_nonexistent_config(tmp_path):
     """Test loading from nonexistent config file."""
-    manager = ConfigManager("nonexistent.json")
-    assert manager.config == DEFAULT_CONFIG
+    with pytest.raises(FileNotFoundError):
+        ConfigManager(str(tmp_path / "nonexistent.json"))
+
+def test_invalid_json_config(tmp_path):
+    """Test handling invalid JSON in config file."""
+    path = tmp_path / "config.json"
+    path.write_text("invalid json")
 
-def test_validate_config_defaults():
-    """Test default values are set for missing configuration."""
-    config = {}
-    manager = ConfigManager()
-    manager.config = config
-    manager._validate_config()
-    assert manager.config["logging"]["level"] == DEFAULT_CONFIG["logging"]["level"]
+    with pytest.raises(ValueError):
+        ConfigManager(str(path))
 
-def test_env_override():
-    """Test environment variable override."""
-    os.environ["LOG_LEVEL"] = "DEBUG"
-    manager = ConfigManager()
-    assert manager.config["logging"]["level"] == "DEBUG"
-    os.environ.pop("LOG_LEVEL")
+def test_unreadable_config(temp_config_file):
+    """Test errors opening the config file are not swallowed."""
+    # chmod is ignored on Windows and when running as root, so fail the read directly
+    with mock.patch("builtins.open", side_effect=PermissionError("denied")):
+        with pytest.raises(PermissionError):
+            ConfigManager(temp_config_file)
 
-def test_save_config(temp_config_file):
-    """Test saving configuration."""
+@pytest.mark.parametrize("section,key,env_var", SECRET_ENV_VARS)
+def test_env_override(monkeypatch, temp_config_file, section, key, env_var):
+    """Test secrets from the environment override the config file."""
+    monkeypatch.setenv(env_var, "env_secret_value")
     manager = ConfigManager(temp_config_file)
-    manager.config["test_key"] = "test_value"
-    manager.save()
-    
-    with open(temp_config_file) as f:
-        saved_config = json.load(f)
-    assert saved_config["test_key"] == "test_value"
-
-def test_invalid_json_config():
-    """Test handling invalid JSON in config file."""
-    with tempfile.NamedTemporaryFile(mode='w', delete=False) as f:
-        f.write("invalid json")
-    
-    manager = ConfigManager(f.name)
-    assert manager.config == DEFAULT_CONFIG
-    os.unlink(f.name)
+    assert manager.config[section][key] == "env_secret_value"
 
-def test_config_type_validation():
-    """Test type validation and conversion."""
+def test_env_placeholder_substitution(monkeypatch):
+    """Test ${VAR} placeholders are filled from the environment."""
+    monkeypatch.setenv("MEDIA_ROOT", "/data")
+    monkeypatch.delenv("UNSET_SECRET", raising=False)
     config = {
-        "download": {
-            "max_retries": "3",
-            "chunk_size": "1024",
-            "progress_update_interval": "5"
-        }
+        "paths": {"movies_dir": "${MEDIA_ROOT}/movies", "dirs": ["${MEDIA_ROOT}/tv"]},
+        "tmdb": {"api_key": "${UNSET_SECRET}", "include_adult": False}
+    }
+    assert ConfigManager._substitute_env(config) == {
+        "paths": {"movies_dir": "/data/movies", "dirs": ["/data/tv"]},
+        "tmdb": {"api_key": "${UNSET_SECRET}", "include_adult": False}
     }
-    manager = ConfigManager()
-    manager.config = config
-    manager._validate_config()
-    
-    assert isinstance(manager.config["download"]["max_retries"], int)
-    assert isinstance(manager.config["download"]["chunk_size"], int)
-    assert isinstance(manager.config["download"]["progress_update_interval"], int)
 
-def test_notification_telegram_sync():
-    """Test notification and telegram settings sync."""
+def test_env_placeholders_filled_on_load(monkeypatch, tmp_path):
+    """Test placeholders in the config file are substituted when it is loaded."""
+    monkeypatch.setenv("MEDIA_ROOT", "/data")
     config = {
-        "notification": {
-            "enabled": True,
-            "method": "telegram",
-            "bot_token": "test_token",
-            "chat_id": "test_chat"
-        }
+        **BASE_CONFIG,
+        "paths": {**BASE_CONFIG["paths"], "movies_dir": "${MEDIA_ROOT}/movies"}
     }
-    manager = ConfigManager()
-    manager.config = config
-    manager._validate_config()
-    
-    assert manager.config["telegram"]["bot_token"] == "test_token"
-    assert manager.config["telegram"]["chat_id"] == "test_chat"
+    path = tmp_path / "config.json"
+    path.write_bytes(orjson.dumps(config))
 
-def test_config_creation_error():
-    """Test error handling during config creation."""
-    with tempfile.NamedTemporaryFile(mode='w', delete=False) as f:
-        f.write("{}")
-    os.chmod(f.name, 0o444)  # Make file read-only
-    
-    manager = ConfigManager(f.name)
-    manager.config["test"] = "value"
-    manager.save()  # Should not raise exception
-    
-    os.chmod(f.name, 0o666)  # Restore permissions
-    os.unlink(f.name)
\ No newline at end of file
+    manager = ConfigManager(str(path))
+    assert manager.config["paths"]["movies_dir"] == "/data/movies"
+    assert manager.config["paths"]["tv_shows_dir"] == "media/tv_shows"
@@ -3,7 +3,6 @@ import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from media_manager.common.notification_service import NotificationService
 
-@pytest.mark.asyncio
 async def test_notify(notification_service):
     """Test basic notification."""
     notification_service.bot.send_message = AsyncMock()
@@ -13,7 +12,6 @@ async def test_notify(notification_service):
         text="test message"
     )
 
-@pytest.mark.asyncio
 async def test_notify_with_reply(notification_service):
     """Test notification with reply."""
     notification_service.bot.send_message = AsyncMock(return_value=MagicMock(message_id=123))
@@ -35,14 +33,12 @@ async def test_notify_with_reply(notification_service):
     response = await notification_service.notify("test message", wait_response=True)
     assert response == "user response"
 
-@pytest.mark.asyncio
 async def test_response_timeout(notification_service):
     """Test notification response timeout."""
     notification_service.bot.send_message = AsyncMock(return_value=MagicMock(message_id=123))
     response = await notification_service.notify("test message", wait_response=True, response_timeout=0.1)
     assert response is None
 
-@pytest.mark.asyncio
 async def test_multiple_responses(notification_service):
     """Test handling multiple responses."""
     message_ids = [123, 456]
@@ -68,7 +64,6 @@ async def test_multiple_responses(notification_service):
     received_responses = await notification_service.notify_all(messages, wait_responses=True)
     assert received_responses == responses
 
-@pytest.mark.asyncio
 async def test_command_handling(notification_service):
     """Test command registration and handling."""
     command_handler = AsyncMock()
@@ -3,12 +3,35 @@ import pytest
 import asyncio
 import time
 from unittest import mock
-from media_manager.common.rate_limiters import AsyncRateLimiter, ThreadedRateLimiter, SpeedLimiter, StatsManager
+from media_manager.common.rate_limiters import (
+    AsyncRateLimiter, AsyncTokenBucket, ThreadedRateLimiter, SpeedLimiter, StatsManager
+)
 
-@pytest.mark.asyncio
-async def test_async_rate_limiter():
+class FakeClock:
+    """Manually advanced clock; sleeping on it advances it instantly."""
+    
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+        
+    def __call__(self) -> float:
+        return self.now
+        
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+        
+    async def sleep(self, seconds: float) -> None:
+        self.advance(seconds)
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake clock that the limiters' asyncio.sleep calls advance."""
+    fake = FakeClock()
+    monkeypatch.setattr(asyncio, "sleep", fake.sleep)
+    return fake
+
+async def test_async_rate_limiter(clock):
     """Test async rate limiter."""
-    limiter = AsyncRateLimiter(min_interval=0.1)
+    limiter = AsyncRateLimiter(min_interval=0.1, time_source=clock)
     key = "test"
     
     # First update should be allowed
@@ -18,10 +41,9 @@ async def test_async_rate_limiter():
     assert await limiter.can_update(key) is False
     
     # Wait and try again
-    await asyncio.sleep(0.2)
+    clock.advance(0.2)
     assert await limiter.can_update(key) is True
 
-@pytest.mark.asyncio
 async def test_async_rate_limiter_multiple_keys():
     """Test async rate limiter with different keys."""
     limiter = AsyncRateLimiter(min_interval=0.1)
@@ -34,22 +56,37 @@ async def test_async_rate_limiter_multiple_keys():
     assert await limiter.can_update("key1") is False
     assert await limiter.can_update("key2") is False
 
-@pytest.mark.asyncio
-async def test_async_rate_limiter_wait():
+async def test_async_rate_limiter_wait(clock):
     """Test wait_if_needed function."""
-    limiter = AsyncRateLimiter(min_interval=0.1)
+    limiter = AsyncRateLimiter(min_interval=0.1, time_source=clock)
     key = "test"
     
     # First call should return immediately
-    start = time.time()
+    start = clock()
     await limiter.wait_if_needed(key)
-    assert time.time() - start < 0.05  # Allow some margin
+    assert clock() == start
     
-    # Second call should wait
-    start = time.time()
+    # Second call should wait out the interval
+    clock.advance(0.03)
+    start = clock()
     await limiter.wait_if_needed(key)
-    elapsed = time.time() - start
-    assert 0.08 <= elapsed <= 0.15  # Allow more margin
+    assert clock() - start == pytest.approx(0.07)
+
+async def test_async_token_bucket(clock):
+    """Test token bucket allows a burst, then paces to the rate."""
+    bucket = AsyncTokenBucket(rate=5, period=0.5, time_source=clock)  # 10 per second
+    
+    # A full bucket lets a burst through immediately
+    start = clock()
+    for _ in range(5):
+        async with bucket:
+            pass
+    assert clock() == start
+    
+    # Further operations wait for tokens to refill
+    for _ in range(3):
+        await bucket.acquire()
+    assert clock() - start == pytest.approx(0.3)
 
 def test_threaded_rate_limiter():
     """Test threaded rate limiter."""
@@ -77,50 +114,41 @@ def test_threaded_rate_limiter_multiple_keys():
     limiter.wait_if_needed("key2")
     assert time.time() - start < 0.05
 
-@pytest.mark.asyncio
-async def test_speed_limiter_no_limit():
+async def test_speed_limiter_no_limit(clock):
     """Test speed limiter with no limit set."""
-    limiter = SpeedLimiter()
-    start = time.time()
+    limiter = SpeedLimiter(time_source=clock)
+    start = clock()
     await limiter.limit(1024 * 1024)  # 1MB
-    assert time.time() - start < 0.05
+    assert clock() == start
 
-@pytest.mark.asyncio
-async def test_speed_limiter():
+async def test_speed_limiter(clock):
     """Test speed limiter with limit."""
     # Set 2 MB/s limit
-    limiter = SpeedLimiter(max_speed_mbps=16)  # 16 Mbps = 2 MB/s
+    limiter = SpeedLimiter(max_speed_mbps=16, time_source=clock)  # 16 Mbps = 2 MB/s
     chunk_size = 1024 * 1024  # 1MB
     
-    # First chunk should go through quickly
-    start = time.time()
+    # First chunk should go through without waiting
+    start = clock()
     await limiter.limit(chunk_size)
-    first_elapsed = time.time() - start
-    assert first_elapsed < 0.1
+    assert clock() == start
     
-    # Second chunk should be delayed to maintain speed limit
-    start = time.time()
+    # Second chunk should be delayed to maintain speed limit:
+    # about 0.5s for 1MB at 2MB/s
     await limiter.limit(chunk_size)
-    second_elapsed = time.time() - start
-    
-    # Should take approximately 0.5s for 1MB at 2MB/s
-    # Allow generous margin to avoid flaky tests
-    assert 0.3 <= second_elapsed <= 0.7
+    assert clock() - start == pytest.approx(chunk_size / 2_000_000)
 
-@pytest.mark.asyncio
-async def test_speed_limiter_small_chunks():
+async def test_speed_limiter_small_chunks(clock):
     """Test speed limiter with small chunks."""
-    limiter = SpeedLimiter(max_speed_mbps=8)  # 8 Mbps = 1 MB/s
+    limiter = SpeedLimiter(max_speed_mbps=8, time_source=clock)  # 8 Mbps = 1 MB/s
     chunk_size = 1024  # 1KB
     
-    start = time.time()
+    start = clock()
     # Send 1024 chunks of 1KB (total 1MB)
     for _ in range(1024):
         await limiter.limit(chunk_size)
-    elapsed = time.time() - start
     
-    # Should take around 1 second, allow generous margin
-    assert 0.8 <= elapsed <= 1.5
+    # Should take around 1 second
+    assert 0.9 <= clock() - start <= 1.1
 
 def test_stats_manager():
     """Test StatsManager functionality."""
@@ -15,18 +15,34 @@ if project_root not in sys.path:
 
 from media_manager.common.notification_service import NotificationService
 
-# Configure event loop policy for Windows if needed
+try:
+    from blockbuster import BlockBuster
+except ImportError:  # Optional; only used to catch blocking calls in tests
+    BlockBuster = None
+
+# Configure event loop policy for Windows if needed; pytest-asyncio
+# creates and closes the loops themselves (see pytest.ini)
 if platform.system() == "Windows":
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
-@pytest.fixture(scope="function", autouse=True)
-def event_loop():
-    """Create an instance of the default event loop for each test case."""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    yield loop
-    loop.close()
-    asyncio.set_event_loop(None)
+@pytest.fixture(scope="session", autouse=True)
+def blockbuster():
+    """Fail async tests that make blocking calls from media_manager code.
+    
+    Only calls made on a running event loop are checked. Skipped when
+    blockbuster isn't installed.
+    """
+    if BlockBuster is None:
+        yield None
+        return
+    bb = BlockBuster(scanned_modules=["media_manager"])
+    # Log records are written synchronously by design
+    for name, function in bb.functions.items():
+        if name.startswith("io.") or name == "os.write":
+            function.can_block_in("logging/__init__.py", "emit")
+    bb.activate()
+    yield bb
+    bb.deactivate()
 
 @pytest.fixture
 def config():
@@ -71,6 +87,7 @@ def mock_categorizer():
 @pytest.fixture
 def notification_service(config):
     """Create notification service instance with mocked bot."""
-    service = NotificationService(config)
+    # NotificationService reads its settings from a config manager
+    service = NotificationService(mock.Mock(config=config))
     service.bot = mock.AsyncMock()
     return service
\ No newline at end of file
@@ -1,10 +1,26 @@
 """Tests for Telegram downloader bot."""
+import inspect
 import os
+import shutil
 import tempfile
 from unittest import IsolatedAsyncioTestCase, mock
 from media_manager.common.notification_service import NotificationService
 from media_manager.downloader.bot import TelegramDownloader
 
+# Public methods of NotificationService, introspected once rather than by a
+# spec'd AsyncMock in every test; True for coroutine methods
+_NOTIF_METHODS = {
+    name: inspect.iscoroutinefunction(member)
+    for name, member in inspect.getmembers(NotificationService, inspect.isfunction)
+    if not name.startswith('_')
+}
+
+class _FastNotif:
+    """Cheap stand-in for NotificationService with a mock per public method."""
+    def __init__(self):
+        for name, is_async in _NOTIF_METHODS.items():
+            setattr(self, name, mock.AsyncMock() if is_async else mock.Mock())
+
 class AsyncIterator:
     """Helper class to mock async iterators."""
     def __init__(self, items):
@@ -22,9 +38,21 @@ class AsyncIterator:
 class TestTelegramDownloader(IsolatedAsyncioTestCase):
     """Test cases for TelegramDownloader."""
     
+    @classmethod
+    def setUpClass(cls):
+        """Create one temporary root shared by all tests."""
+        cls._root = tempfile.mkdtemp()
+        
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the shared temporary root."""
+        shutil.rmtree(cls._root, ignore_errors=True)
+    
     async def asyncSetUp(self):
         """Set up test environment."""
-        self.temp_dir = tempfile.mkdtemp()
+        # Each test gets its own directory under the shared root
+        self.temp_dir = os.path.join(self._root, self._testMethodName)
+        os.makedirs(self.temp_dir)
         self.config = {
             "paths": {
                 "telegram_download_dir": os.path.join(self.temp_dir, "downloads")
@@ -42,14 +70,8 @@ class TestTelegramDownloader(IsolatedAsyncioTestCase):
                 "verify_downloads": True
             }
         }
-        self.notification = mock.AsyncMock(spec=NotificationService)
+        self.notification = _FastNotif()
         self.downloader = TelegramDownloader(self.config, self.notification)
-        
-    async def asyncTearDown(self):
-        """Clean up test environment."""
-        if os.path.exists(self.temp_dir):
-            import shutil
-            shutil.rmtree(self.temp_dir)
             
     async def test_process_media_document(self):
         """Test processing media document."""
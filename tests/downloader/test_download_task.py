@@ -0,0 +1,67 @@
+"""Tests for download task management."""
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from media_manager.downloader.download_task import DownloadManager
+
+@pytest.fixture
+def manager(tmp_path):
+    """Create a download manager whose workers are never started."""
+    config_manager = MagicMock()
+    config_manager.config = {
+        "paths": {
+            "telegram_download_dir": str(tmp_path / "downloads")
+        },
+        "download": {
+            "max_concurrent_downloads": 2,
+            "verify_downloads": False
+        }
+    }
+    manager = DownloadManager(config_manager, AsyncMock())
+    with patch.object(manager, "_ensure_workers"):
+        yield manager
+
+def make_message(file_id, file_unique_id, file_name="test.mp4"):
+    """Create a document message."""
+    message = MagicMock()
+    message.document.file_id = file_id
+    message.document.file_unique_id = file_unique_id
+    message.document.file_name = file_name
+    message.document.file_size = 1024
+    return message
+
+async def test_forwarded_duplicate_is_not_queued(manager):
+    first = await manager.process_media_message(make_message("file_id_1", "unique_1"))
+    assert first is not None
+    assert first.file_unique_id == "unique_1"
+    
+    # A forward of the same file gets a new file_id but keeps file_unique_id
+    duplicate = await manager.process_media_message(make_message("file_id_2", "unique_1"))
+    assert duplicate is None
+    assert manager._download_queue.qsize() == 1
+    
+    other = await manager.process_media_message(make_message("file_id_3", "unique_2"))
+    assert other is not None
+    assert manager._download_queue.qsize() == 2
+
+@pytest.mark.parametrize("error", [None, RuntimeError("connection lost")])
+async def test_finished_download_releases_file(manager, error):
+    task = await manager.process_media_message(make_message("file_id_1", "unique_1"))
+    manager._download_file = AsyncMock(side_effect=error)
+    
+    await manager._process_download(task)
+    
+    assert task.status == ("failed" if error else "completed")
+    stats = manager.stats_manager.get_category("downloads")
+    assert stats["total"] == 1
+    if error:
+        assert stats["failed"] == 1
+        assert stats.get("successful", 0) == 0
+    else:
+        assert stats["successful"] == 1
+        assert stats["total_bytes"] == 1024
+    assert "unique_1" not in manager._pending_files
+    assert not manager._active_downloads
+    
+    # The same file can be queued again once it is no longer pending
+    again = await manager.process_media_message(make_message("file_id_2", "unique_1"))
+    assert again is not None
@@ -31,7 +31,6 @@ async def downloader(config):
         yield downloader
         await downloader.stop()
 
-@pytest.mark.asyncio
 async def test_main_successful_startup():
     """Test successful main startup."""
     mock_config = {
@@ -53,7 +52,6 @@ async def test_main_successful_startup():
         mock_downloader.start.assert_called_once()
         mock_downloader.stop.assert_called_once()
 
-@pytest.mark.asyncio
 async def test_main_startup_error():
     """Test main startup with configuration error."""
     with patch("media_manager.downloader.run_downloader.ConfigManager",
@@ -62,7 +60,6 @@ async def test_main_startup_error():
         await main()
         mock_exit.assert_called_once_with(1)
 
-@pytest.mark.asyncio
 async def test_main_signal_handling():
     """Test signal handling in main."""
     mock_config = {
@@ -91,7 +88,6 @@ async def test_main_signal_handling():
         await task
         mock_downloader.stop.assert_called_once()
 
-@pytest.mark.asyncio
 async def test_main_directory_creation_error():
     """Test main with directory creation error."""
     mock_config = {
@@ -107,7 +103,6 @@ async def test_main_directory_creation_error():
         await main()
         mock_exit.assert_called_once_with(1)
 
-@pytest.mark.asyncio
 async def test_config_loading_error():
     """Test configuration loading error."""
     with patch("media_manager.downloader.run_downloader.ConfigManager",
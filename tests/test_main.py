@@ -39,7 +39,6 @@ def config():
         }
     }
 
-@pytest.mark.asyncio
 async def test_media_manager_initialization(config):
     """Test media manager initialization."""
     with patch("media_manager.main.ConfigManager") as mock_config, \
@@ -57,7 +56,6 @@ async def test_media_manager_initialization(config):
         mock_categorizer.assert_called_once()
         mock_watcher.assert_called_once()
 
-@pytest.mark.asyncio
 async def test_media_manager_start(config):
     """Test media manager start."""
     with patch("media_manager.main.ConfigManager") as mock_config, \
@@ -76,7 +74,6 @@ async def test_media_manager_start(config):
         
         mock_instance.start.assert_called_once()
 
-@pytest.mark.asyncio
 async def test_media_manager_shutdown(config):
     """Test media manager shutdown."""
     with patch("media_manager.main.ConfigManager") as mock_config, \
@@ -95,7 +92,6 @@ async def test_media_manager_shutdown(config):
         
         mock_instance.stop.assert_called_once()
 
-@pytest.mark.asyncio
 async def test_media_manager_signal_handling(config):
     """Test signal handling."""
     with patch("media_manager.main.ConfigManager") as mock_config, \
@@ -114,7 +110,6 @@ async def test_media_manager_signal_handling(config):
             await asyncio.sleep(0.1)  # Allow signal handler to process
             mock_shutdown.assert_called_once()
 
-@pytest.mark.asyncio
 async def test_main_entry_point():
     """Test main entry point."""
     with patch("media_manager.main.MediaManager") as mock_manager_class:
@@ -130,7 +125,6 @@ async def test_main_entry_point():
         mock_manager.initialize.assert_called_once()
         mock_manager.start.assert_called_once()
 
-@pytest.mark.asyncio
 async def test_main_error_handling():
     """Test error handling in main."""
     with patch("media_manager.main.MediaManager") as mock_manager_class, \
@@ -35,7 +35,6 @@ def categorizer(config, mock_tmdb, mock_notifier):
     with patch("media_manager.watcher.categorizer.TMDBClient", return_value=mock_tmdb):
         return MediaCategorizer(config, mock_notifier)
 
-@pytest.mark.asyncio
 async def test_parse_movie_filename():
     """Test parsing movie filenames."""
     test_cases = [
@@ -48,7 +47,6 @@ async def test_parse_movie_filename():
         assert title == expected_title
         assert year == expected_year
 
-@pytest.mark.asyncio
 async def test_parse_tv_show_filename():
     """Test parsing TV show filenames."""
     test_cases = [
@@ -62,7 +60,6 @@ async def test_parse_tv_show_filename():
         assert season == expected_season
         assert episode == expected_episode
 
-@pytest.mark.asyncio
 async def test_process_movie(categorizer, mock_tmdb):
     """Test processing movie files."""
     filename = "The.Movie.2024.1080p.WEBRip.x264-GROUP"
@@ -78,7 +75,6 @@ async def test_process_movie(categorizer, mock_tmdb):
     assert result
     mock_tmdb.search_movie.assert_called_once_with("The Movie", 2024)
 
-@pytest.mark.asyncio
 async def test_process_tv_show(categorizer, mock_tmdb):
     """Test processing TV show files."""
     filename = "Show.Name.S01E02.720p.WEBRip.x264-GROUP"
@@ -103,7 +99,6 @@ async def test_process_tv_show(categorizer, mock_tmdb):
     mock_tmdb.search_tv_show.assert_called_once_with("Show Name")
     mock_tmdb.get_episode_details.assert_called_once_with(1, 1, 2)
 
-@pytest.mark.asyncio
 async def test_process_file(categorizer, mock_tmdb):
     """Test processing media files."""
     movie_file = "The.Movie.2024.1080p.WEBRip.x264-GROUP"
@@ -132,7 +127,6 @@ async def test_process_file(categorizer, mock_tmdb):
     mock_tmdb.search_movie.assert_called_once()
     mock_tmdb.search_tv_show.assert_called_once()
 
-@pytest.mark.asyncio
 async def test_process_file_no_match(categorizer, mock_tmdb, mock_notifier):
     """Test processing file with no match."""
     filename = "Unknown.File.2024.1080p.WEBRip.x264-GROUP"
@@ -146,14 +140,12 @@ async def test_process_file_no_match(categorizer, mock_tmdb, mock_notifier):
         level="warning"
     )
 
-@pytest.mark.asyncio
 async def test_move_to_unmatched(categorizer, mock_notifier):
     """Test moving file to unmatched directory."""
     filename = "Unknown.File.mkv"
     await categorizer.move_to_unmatched(filename)
     mock_notifier.notify.assert_called_once()
 
-@pytest.mark.asyncio
 async def test_error_handling(categorizer, mock_tmdb, mock_notifier):
     """Test error handling during processing."""
     filename = "Test.Movie.2024.1080p.WEBRip.x264-GROUP"
@@ -1,90 +1,199 @@
 """Tests for media file mover functionality."""
 import os
+import asyncio
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
-from media_manager.watcher.file_mover import MediaWatcher
+from media_manager.watcher.file_mover import MediaFileHandler, MediaWatcher
 
-@pytest.mark.asyncio
 async def test_media_watcher_initialization(config, mock_categorizer, notification_service):
     """Test media watcher initialization."""
     watcher = MediaWatcher(config, mock_categorizer, notification_service)
     assert watcher.config == config
     assert watcher.categorizer == mock_categorizer
-    assert watcher.notification_service == notification_service
+    assert watcher.notification == notification_service
+    assert not watcher._running
 
-@pytest.mark.asyncio
-async def test_media_file_handler_initialization(config, mock_categorizer, notification_service):
-    """Test media file handler initialization."""
+async def test_media_file_handler_initialization(config, mock_categorizer, notification_service, tmp_path):
+    """Test media watcher hands an existing file to the categorizer."""
     watcher = MediaWatcher(config, mock_categorizer, notification_service)
-    test_file = "test.mkv"
-    mock_categorizer.process_file.return_value = ("Movies", "Test Movie (2024)")
+    test_file = tmp_path / "test.mkv"
+    test_file.write_bytes(b"test content")
+    mock_categorizer.process_file.return_value = True
     
-    await watcher._handle_media_file(test_file)
-    mock_categorizer.process_file.assert_called_once_with(test_file)
+    await watcher._handle_media_file(str(test_file))
+    mock_categorizer.process_file.assert_called_once_with(str(test_file))
+    mock_categorizer.move_to_unmatched.assert_not_called()
 
-@pytest.mark.asyncio
-async def test_media_file_handler_new_file(config, mock_categorizer, notification_service):
-    """Test handling new media file."""
+async def test_media_file_handler_new_file(config, mock_categorizer, notification_service, tmp_path):
+    """Test handling a media file that no longer exists."""
     watcher = MediaWatcher(config, mock_categorizer, notification_service)
-    test_file = "test_movie.mkv"
-    mock_categorizer.process_file.return_value = ("Movies", "Test Movie (2024)")
+    test_file = str(tmp_path / "test_movie.mkv")
     
-    with patch('os.path.exists') as mock_exists, \
-         patch('shutil.move') as mock_move:
-        mock_exists.return_value = False
+    with patch.object(notification_service, "notify", AsyncMock()) as mock_notify:
         await watcher._handle_media_file(test_file)
-        mock_move.assert_called_once()
+        
+    mock_categorizer.process_file.assert_not_called()
+    assert "File not found" in mock_notify.call_args.args[0]
+    assert mock_notify.call_args.kwargs == {"level": "error"}
 
-@pytest.mark.asyncio
-async def test_media_file_handler_failed_processing(config, mock_categorizer, notification_service):
+async def test_media_file_handler_failed_processing(config, mock_categorizer, notification_service, tmp_path):
     """Test handling failed file processing."""
     watcher = MediaWatcher(config, mock_categorizer, notification_service)
-    test_file = "invalid_file.mkv"
-    mock_categorizer.process_file.return_value = (None, None)
+    test_file = tmp_path / "invalid_file.mkv"
+    test_file.write_bytes(b"test content")
+    mock_categorizer.process_file.return_value = False
     
-    with patch('shutil.move') as mock_move:
-        await watcher._handle_media_file(test_file)
-        mock_move.assert_called_once()
-        assert notification_service.bot.send_message.called
+    await watcher._handle_media_file(str(test_file))
+    mock_categorizer.move_to_unmatched.assert_called_once_with(str(test_file))
 
-@pytest.mark.asyncio
-async def test_media_file_handler_duplicate_processing(config, mock_categorizer, notification_service):
-    """Test handling duplicate file processing."""
+async def test_media_file_handler_duplicate_processing(config, mock_categorizer, notification_service, tmp_path):
+    """Test a processing error is reported and the file moved to unmatched."""
     watcher = MediaWatcher(config, mock_categorizer, notification_service)
-    test_file = "duplicate.mkv"
-    mock_categorizer.process_file.return_value = ("Movies", "Test Movie (2024)")
+    test_file = tmp_path / "duplicate.mkv"
+    test_file.write_bytes(b"test content")
+    mock_categorizer.process_file.side_effect = RuntimeError("probe failed")
     
-    with patch('os.path.exists') as mock_exists:
-        mock_exists.return_value = True
-        await watcher._handle_media_file(test_file)
-        assert notification_service.bot.send_message.called
+    with patch.object(notification_service, "notify", AsyncMock()) as mock_notify:
+        await watcher._handle_media_file(str(test_file))
+        
+    assert "probe failed" in mock_notify.call_args.args[0]
+    mock_categorizer.move_to_unmatched.assert_called_once_with(str(test_file))
 
-@pytest.mark.asyncio
-async def test_media_watcher_process_existing(config, mock_categorizer, notification_service):
+async def test_media_watcher_process_existing(config, mock_categorizer, notification_service, tmp_path):
     """Test processing existing files."""
+    config["paths"]["telegram_download_dir"] = str(tmp_path)
+    for name in ("test1.mkv", "test2.mkv"):
+        (tmp_path / name).write_bytes(b"test content")
+    # Subdirectories are not media files
+    (tmp_path / "subdir").mkdir()
+    
     watcher = MediaWatcher(config, mock_categorizer, notification_service)
+    watcher._running = True
     
-    with patch('os.walk') as mock_walk, \
-         patch.object(watcher, '_handle_media_file') as mock_handle:
-        mock_walk.return_value = [
-            ('/downloads', [], ['test1.mkv', 'test2.mkv'])
-        ]
+    with patch.object(watcher, '_handle_media_file', AsyncMock()) as mock_handle:
         await watcher.process_existing_files()
         assert mock_handle.call_count == 2
+        handled = sorted(call.args[0] for call in mock_handle.call_args_list)
+        assert handled == [str(tmp_path / "test1.mkv"), str(tmp_path / "test2.mkv")]
 
-@pytest.mark.asyncio
-async def test_media_watcher_start_stop(config, mock_categorizer, notification_service):
+async def test_media_watcher_start_stop(config, mock_categorizer, notification_service, tmp_path):
     """Test watcher start and stop."""
+    config["paths"]["telegram_download_dir"] = str(tmp_path)
+    config["watcher"] = {"backend": "polling"}
     watcher = MediaWatcher(config, mock_categorizer, notification_service)
     
-    with patch('asyncio.create_task') as mock_create_task:
-        mock_task = AsyncMock()
-        mock_create_task.return_value = mock_task
+    watcher.start()
+    assert watcher._running
+    assert watcher.observer.is_alive()
+    
+    await watcher.stop()
+    assert not watcher._running
+    assert not watcher.observer.is_alive()
+    assert watcher.event_handler._pump is None
+
+async def wait_for_calls(mock, count):
+    """Yield to the loop until a mock has been awaited count times."""
+    async def poll():
+        while mock.await_count < count:
+            await asyncio.sleep(0)
+    await asyncio.wait_for(poll(), timeout=1)
+
+async def test_file_handler_recent_files_evicted_in_lru_order(mock_categorizer, tmp_path):
+    """Test the recent-files memory keeps the most recently seen files."""
+    handler = MediaFileHandler(mock_categorizer, asyncio.get_running_loop())
+    handler.RECENT_FILES_LIMIT = 2
+    keys = [(str(tmp_path / f"test{i}.mkv"), 1024, i) for i in range(3)]
+    
+    handler._remember(keys[0])
+    handler._remember(keys[1])
+    handler._remember(keys[0])  # Seen again, so keys[1] is now the oldest
+    handler._remember(keys[2])
+    
+    assert list(handler._recent) == [keys[0], keys[2]]
+
+async def test_file_handler_skips_unchanged_recent_file(mock_categorizer, tmp_path):
+    """Test a duplicate event for an already processed file is ignored."""
+    test_file = tmp_path / "test.mkv"
+    test_file.write_bytes(b"test content")
+    handler = MediaFileHandler(mock_categorizer, asyncio.get_running_loop())
+    handler._remember(await handler._get_recent_key(str(test_file)))
+    
+    await handler._handle_new_file(str(test_file))
+    
+    mock_categorizer.process_file.assert_not_called()
+    assert not handler._processing_files
+    
+    # A changed file is processed again
+    test_file.write_bytes(b"new test content")
+    assert await handler._get_recent_key(str(test_file)) not in handler._recent
+
+async def test_file_handler_pump_drains_queue(mock_categorizer):
+    """Test every queued event is handed to a processing task."""
+    handler = MediaFileHandler(mock_categorizer, asyncio.get_running_loop())
+    handler._handle_new_file = AsyncMock()
+    paths = ["/downloads/test1.mkv", "/downloads/test2.mkv", "/downloads/test3.mkv"]
+    
+    handler.start()
+    for path in paths:
+        handler.on_created(MagicMock(is_directory=False, src_path=path))
+    handler.on_created(MagicMock(is_directory=True, src_path="/downloads/subdir"))
+    await wait_for_calls(handler._handle_new_file, len(paths))
+    
+    assert [call.args[0] for call in handler._handle_new_file.await_args_list] == paths
+    assert handler._queue.empty()
+    
+    await handler.stop()
+    assert handler._pump is None
+
+async def test_file_handler_pump_survives_processing_error(mock_categorizer):
+    """Test an error processing one file doesn't stop the pump."""
+    handler = MediaFileHandler(mock_categorizer, asyncio.get_running_loop())
+    handler._handle_new_file = AsyncMock(side_effect=[RuntimeError("boom"), None, None])
+    paths = ["/downloads/test1.mkv", "/downloads/test2.mkv", "/downloads/test3.mkv"]
+
+    handler.start()
+    for path in paths:
+        handler.on_created(MagicMock(is_directory=False, src_path=path))
+    await wait_for_calls(handler._handle_new_file, len(paths))
+
+    assert [call.args[0] for call in handler._handle_new_file.await_args_list] == paths
+    assert not handler._pump.done()
+
+    await handler.stop()
+
+async def test_file_handler_limits_concurrent_processing(mock_categorizer, tmp_path):
+    """Test no more than max_concurrent files are categorized at once."""
+    handler = MediaFileHandler(mock_categorizer, asyncio.get_running_loop(), max_concurrent=2)
+    running = 0
+    peak = 0
+    release = asyncio.Event()
+    
+    async def process_file(file_path):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await release.wait()
+        running -= 1
+        return True
+    mock_categorizer.process_file.side_effect = process_file
+    
+    paths = []
+    for i in range(5):
+        path = tmp_path / f"test{i}.mkv"
+        path.write_bytes(b"test content")
+        paths.append(str(path))
+    st = os.stat(paths[0])
+    
+    with patch.object(handler, "_wait_for_file_ready", AsyncMock(return_value=st)):
+        tasks = [asyncio.create_task(handler._handle_new_file(path)) for path in paths]
+        await wait_for_calls(mock_categorizer.process_file, 2)
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert running == 2
         
-        await watcher.start()
-        assert watcher._running
-        mock_create_task.assert_called_once()
+        release.set()
+        await asyncio.gather(*tasks)
         
-        await watcher.stop()
-        assert not watcher._running
-        mock_task.cancel.assert_called_once()
\ No newline at end of file
+    assert peak == 2
+    assert mock_categorizer.process_file.await_count == 5
+    mock_categorizer.move_to_unmatched.assert_not_called()
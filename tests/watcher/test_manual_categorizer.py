@@ -3,7 +3,9 @@ import os
 import tempfile
 from unittest import IsolatedAsyncioTestCase, mock
 from media_manager.common.notification_service import NotificationService
-from media_manager.watcher.manual_categorizer import ManualCategorizer
+from media_manager.watcher.manual_categorizer import (
+    ManualCategorizer, Session, _INVALID_SELECTION, _SKIPPED, _TYPE_PROMPT
+)
 from media_manager.watcher.categorizer import MediaCategorizer
 
 class TestManualCategorizer(IsolatedAsyncioTestCase):
@@ -28,6 +30,7 @@ class TestManualCategorizer(IsolatedAsyncioTestCase):
             
         self.notification = mock.AsyncMock(spec=NotificationService)
         self.categorizer = mock.AsyncMock(spec=MediaCategorizer)
+        self.categorizer.tmdb = mock.AsyncMock()
         self.manual = ManualCategorizer(
             self.config,
             self.notification,
@@ -40,7 +43,7 @@ class TestManualCategorizer(IsolatedAsyncioTestCase):
             import shutil
             shutil.rmtree(self.temp_dir)
             
-    def test_get_unmatched_files(self):
+    async def test_get_unmatched_files(self):
         """Test getting list of unmatched files."""
         # Create test files
         files = ["test1.mp4", "test2.mkv", "test3.avi"]
@@ -50,7 +53,7 @@ class TestManualCategorizer(IsolatedAsyncioTestCase):
                 f.write(b"test content")
                 
         # Get unmatched files
-        result = self.manual._get_unmatched_files()
+        result = await self.manual._get_unmatched_files()
         
         # Verify results
         self.assertEqual(len(result), 3)
@@ -73,94 +76,11 @@ class TestManualCategorizer(IsolatedAsyncioTestCase):
         await self.manual._start_categorization(test_file)
         
         # Verify session was created with initial state
-        async with self.manual._session_lock:
-            self.assertIn(test_file, self.manual._active_sessions)
-            self.assertEqual(
-                self.manual._active_sessions[test_file]["stage"],
-                "type"
-            )
-            self.assertIn("last_activity", self.manual._active_sessions[test_file])
-            self.assertEqual(
-                len(self.manual._active_sessions[test_file]["metadata"]),
-                0
-            )
-            
-    async def test_process_movie_details(self):
-        """Test processing movie details."""
-        test_file = os.path.join(
-            self.config["paths"]["unmatched_dir"],
-            "test.mp4"
-        )
-        with open(test_file, "wb") as f:
-            f.write(b"test content")
-            
-        # Set up session
-        async with self.manual._session_lock:
-            self.manual._active_sessions[test_file] = {
-                "stage": "details",
-                "metadata": {"type": "movie"}
-            }
-            
-        # Mock successful media processing
-        self.categorizer._process_movie.return_value = True
-            
-        # Mock notification responses
-        self.notification.wait_for_response.side_effect = [
-            "The Movie",  # Title
-            "2024"       # Year
-        ]
-        
-        # Get movie details
-        await self.manual._get_movie_details(test_file)
-        
-        # Verify metadata was updated and processed
-        self.categorizer._process_movie.assert_called_once_with(
-            test_file,
-            {"title": "The Movie", "year": 2024}
-        )
-        
-        # Verify session was cleared after successful processing
-        async with self.manual._session_lock:
-            self.assertNotIn(test_file, self.manual._active_sessions)
-            
-    async def test_process_tv_show_details(self):
-        """Test processing TV show details."""
-        test_file = os.path.join(
-            self.config["paths"]["unmatched_dir"],
-            "test.mp4"
-        )
-        with open(test_file, "wb") as f:
-            f.write(b"test content")
-
-        # Set up session
-        async with self.manual._session_lock:
-            self.manual._active_sessions[test_file] = {
-                "stage": "details",
-                "metadata": {"type": "tv"}
-            }
-            
-        # Mock successful media processing
-        self.categorizer._process_tv_show.return_value = True
-
-        # Mock notification responses
-        self.notification.wait_for_response.side_effect = [
-            "Show Name",  # Title
-            "1",         # Season
-            "2"          # Episode
-        ]
-        
-        # Get TV show details
-        await self.manual._get_tv_show_details(test_file)
-        
-        # Verify metadata was processed correctly
-        self.categorizer._process_tv_show.assert_called_once_with(
-            test_file,
-            {"show": "Show Name", "season": 1, "episode": 2}
-        )
-        
-        # Verify session was cleared after successful processing
-        async with self.manual._session_lock:
-            self.assertNotIn(test_file, self.manual._active_sessions)
+        session = self.manual._current
+        self.assertEqual(session.path, test_file)
+        self.assertEqual(session.stage, "type")
+        self.assertEqual(session.metadata, {})
+        self.assertIn("test.mp4", self.notification.notify.call_args[0][0])
             
     async def test_handle_commands(self):
         """Test command handling."""
@@ -184,60 +104,14 @@ class TestManualCategorizer(IsolatedAsyncioTestCase):
         list_msg = self.notification.notify.call_args[0][0]
         self.assertIn("test.mp4", list_msg)
         
-        # Test /skip command with no active session
+        # Test /skip command skips the only file
         await self.manual._handle_skip(message)
         self.notification.notify.assert_called_with(
-            "No active categorization session",
-            level="warning"
-        )
-        
-    async def test_process_file_completion(self):
-        """Test complete file processing."""
-        test_file = os.path.join(
-            self.config["paths"]["unmatched_dir"],
-            "test.mp4"
-        )
-        with open(test_file, "wb") as f:
-            f.write(b"test content")
-        
-        # Mock successful categorization
-        self.categorizer._process_movie.return_value = True
-            
-        # Set up session with movie metadata
-        async with self.manual._session_lock:
-            self.manual._active_sessions[test_file] = {
-                "stage": "details",
-                "metadata": {
-                    "type": "movie",
-                    "title": "Test Movie",
-                    "year": 2024
-                }
-            }
-        
-        # Process the file
-        await self.manual._process_file(test_file)
-        
-        # Verify categorizer was called correctly
-        self.categorizer._process_movie.assert_called_once_with(
-            test_file,
-            {"title": "Test Movie", "year": 2024}
+            _SKIPPED.format(filename="test.mp4"),
+            level="info"
         )
-        
-        # Verify session was cleared
-        async with self.manual._session_lock:
-            self.assertNotIn(test_file, self.manual._active_sessions)
-        
-        # Verify notifications in order
-        self.notification.notify.assert_has_calls([
-            mock.call(
-                "Successfully categorized: test.mp4",
-                level="success"
-            ),
-            mock.call(
-                mock.ANY,  # Don't check exact remaining files message
-                level="info"
-            )
-        ], any_order=False)
+        self.assertIsNone(self.manual._current)
+        self.assertEqual(len(self.manual._pending), 0)
         
     async def test_invalid_input_handling(self):
         """Test handling of invalid inputs."""
@@ -249,71 +123,21 @@ class TestManualCategorizer(IsolatedAsyncioTestCase):
             f.write(b"test content")
             
         # Test invalid media type selection
-        self.notification.wait_for_response.return_value = "3"  # Invalid option
         await self.manual._start_categorization(test_file)
+        await self.manual._handle_type_response(test_file, "3")  # Invalid option
         
         self.notification.notify.assert_called_with(
-            "Invalid selection. Please try again.",
+            _INVALID_SELECTION,
             level="warning"
         )
+        self.assertEqual(self.manual._current.stage, "type")
+        self.assertEqual(self.manual._current.attempts, 1)
         
-        # Test invalid season number
-        async with self.manual._session_lock:
-            self.manual._active_sessions[test_file] = {
-                "stage": "details",
-                "metadata": {"type": "tv"}
-            }
-            
-        self.notification.wait_for_response.side_effect = [
-            "Show Name",  # Title
-            "invalid",   # Invalid season
-            "1",        # Valid season
-            "2"         # Episode
-        ]
-        
-        await self.manual._get_tv_show_details(test_file)
-        
-        # Verify error notification was sent
-        notify_calls = self.notification.notify.call_args_list
-        self.assertTrue(
-            any(
-                call[0][0] == "Invalid season number. Please try again."
-                and call[1]["level"] == "warning"
-                for call in notify_calls
-            )
-        )
-        
-    async def test_timeout_handling(self):
-        """Test handling of response timeouts."""
-        test_file = os.path.join(
-            self.config["paths"]["unmatched_dir"],
-            "test.mp4"
-        )
-        with open(test_file, "wb") as f:
-            f.write(b"test content")
-            
-        # Set up session
-        async with self.manual._session_lock:
-            self.manual._active_sessions[test_file] = {
-                "stage": "details",
-                "metadata": {"type": "movie"}
-            }
-            
-        # Simulate timeout by returning None
-        self.notification.wait_for_response.return_value = None
-        
-        # Get movie details
-        await self.manual._get_movie_details(test_file)
-        
-        # Verify session was cleared
-        async with self.manual._session_lock:
-            self.assertNotIn(test_file, self.manual._active_sessions)
-        
-        # Verify timeout notification
-        self.notification.notify.assert_called_with(
-            "Categorization cancelled due to timeout.",
-            level="warning"
-        )
+        # A valid selection moves on to the details prompt
+        await self.manual._handle_type_response(test_file, "2")
+        self.assertEqual(self.manual._current.stage, "details")
+        self.assertEqual(self.manual._current.metadata, {"type": "tv"})
+        self.assertEqual(self.manual._current.attempts, 0)
         
     async def test_continue_iteration(self):
         """Test continuing iteration through multiple files."""
@@ -325,83 +149,147 @@ class TestManualCategorizer(IsolatedAsyncioTestCase):
             with open(path, "wb") as f:
                 f.write(b"test content")
             test_files.append(path)
-
-        # Mock successful categorization and actually move the files
-        async def process_movie_mock(file_path, metadata):
-            # Move file to movies dir to simulate successful processing
-            new_path = os.path.join(
-                self.config["paths"]["movies_dir"],
-                os.path.basename(file_path)
-            )
-            os.rename(file_path, new_path)
-            return True
-
-        self.categorizer._process_movie = mock.AsyncMock(side_effect=process_movie_mock)
             
-        # Process first file
-        async with self.manual._session_lock:
-            self.manual._active_sessions[test_files[0]] = {
-                "stage": "details",
-                "metadata": {
-                    "type": "movie",
-                    "title": "Test Movie 1",
-                    "year": 2024
-                }
-            }
-        
-        # Before processing, we should have 3 files
-        unmatched_before = self.manual._get_unmatched_files()
-        self.assertEqual(len(unmatched_before), 3)
-
-        # Process first file
-        await self.manual._process_file(test_files[0])
+        message = mock.AsyncMock()
         
-        # After processing first file, we should have 2 files
-        unmatched_after = self.manual._get_unmatched_files()
-        self.assertEqual(len(unmatched_after), 2)
-
-        # Verify notifications
-        self.notification.notify.assert_has_calls([
-            mock.call(
-                "Successfully categorized: test1.mp4",
-                level="success"
-            ),
-            mock.call(
-                "2 files remaining to categorize",
+        # /categorize starts with the first file
+        await self.manual._handle_categorize(message)
+        self.assertEqual(self.manual._current.path, test_files[0])
+        self.assertEqual(list(self.manual._pending), test_files)
+        
+        # Each /skip moves on to the next file
+        for i, expected in enumerate(test_files[1:], 1):
+            await self.manual._handle_skip(message)
+            self.assertEqual(self.manual._current.path, expected)
+            self.notification.notify.assert_called_with(
+                _TYPE_PROMPT.format(filename=files[i]),
                 level="info"
             )
-        ], any_order=False)
+            
+        # Skipping the last file ends the batch
+        await self.manual._handle_skip(message)
+        self.assertIsNone(self.manual._current)
+        self.assertEqual(len(self.manual._pending), 0)
 
-        # Reset mocks for next test
-        self.categorizer._process_movie.reset_mock()
+    def _details_session(self, media_type):
+        """Start a session that is waiting for the details reply."""
+        test_file = os.path.join(self.config["paths"]["unmatched_dir"], "test.mp4")
+        self.manual._current = Session(
+            path=test_file, stage="details", metadata={"type": media_type}
+        )
+        return test_file
+        
+    async def test_movie_details_reply(self):
+        """Test a valid "Title (Year)" reply."""
+        test_file = self._details_session("movie")
+        self.categorizer.tmdb.search_movie.return_value = {
+            "id": 603,
+            "title": "The Matrix",
+            "release_date": "1999-03-31",
+            "vote_average": 8.2,
+            "overview": "A hacker learns the truth."
+        }
+        
+        await self.manual._handle_details_response(test_file, " The Matrix ( 1999 ) ")
+        
+        self.categorizer.tmdb.search_movie.assert_any_call("The Matrix", "1999")
+        session = self.manual._current
+        self.assertEqual(session.stage, "confirm")
+        self.assertEqual(session.metadata["title"], "The Matrix")
+        self.assertEqual(session.metadata["type"], "movie")
+        self.assertIn("Movie Found!", self.notification.notify.call_args[0][0])
+        
+    async def test_tv_show_details_reply(self):
+        """Test a valid "Show | Season | Episode" reply."""
+        test_file = self._details_session("tv")
+        self.categorizer.tmdb.search_tv_show.return_value = {
+            "id": 1396,
+            "name": "Breaking Bad",
+            "first_air_date": "2008-01-20"
+        }
+        
+        await self.manual._handle_details_response(test_file, "Breaking Bad | 1 | 5")
+        
+        self.categorizer.tmdb.search_tv_show.assert_called_once_with("Breaking Bad")
+        session = self.manual._current
+        self.assertEqual(session.stage, "confirm")
+        self.assertEqual(session.metadata["name"], "Breaking Bad")
+        self.assertEqual(session.metadata["season"], 1)
+        self.assertEqual(session.metadata["episode"], 5)
+        
+    async def test_invalid_details_reported_together(self):
+        """Test every problem with a details reply is sent in one message."""
+        test_file = self._details_session("movie")
+        
+        await self.manual._handle_details_response(test_file, "(abc)")
+        
+        self.notification.notify.assert_called_once()
+        message = self.notification.notify.call_args[0][0]
+        self.assertIn("Title is missing", message)
+        self.assertIn("Invalid year: abc", message)
+        self.assertEqual(self.notification.notify.call_args[1], {"level": "warning"})
+        self.categorizer.tmdb.search_movie.assert_not_called()
+        self.assertEqual(self.manual._current.stage, "details")
+        self.assertEqual(self.manual._current.attempts, 1)
+        
+    async def test_attempt_cap_ends_session(self):
+        """Test the session is abandoned after too many invalid replies."""
+        test_file = self._details_session("tv")
+        
+        for _ in range(ManualCategorizer.MAX_ATTEMPTS - 1):
+            await self.manual._handle_details_response(test_file, "Breaking Bad | x | 5")
+            self.assertIsNotNone(self.manual._current)
+            
+        await self.manual._handle_details_response(test_file, "Breaking Bad | x | 5")
+        
+        self.assertIsNone(self.manual._current)
+        self.assertIn(
+            "Too Many Invalid Replies",
+            self.notification.notify.call_args[0][0]
+        )
+        self.categorizer.tmdb.search_tv_show.assert_not_called()
+        
+        # Replies for the abandoned session are ignored
         self.notification.notify.reset_mock()
-
-        # Process second file
-        async with self.manual._session_lock:
-            self.manual._active_sessions[test_files[1]] = {
-                "stage": "details",
-                "metadata": {
-                    "type": "movie",
-                    "title": "Test Movie 2",
-                    "year": 2024
-                }
-            }
+        await self.manual._handle_details_response(test_file, "Breaking Bad | 1 | 5")
+        self.notification.notify.assert_not_called()
+        
+    def test_parse_bounded_int(self):
+        """Test parsing whole numbers within bounds."""
+        cases = [
+            ("1999", 1900, 2100, 1999),
+            (" 7 ", 1, 10**9, 7),
+            ("1899", 1900, 2100, None),
+            ("2101", 1900, 2100, None),
+            ("0", 1, 10**9, None),
+            ("-1", 1, 10**9, None),
+            ("1.5", 1, 10**9, None),
+            ("", 1, 10**9, None),
+            ("abc", 1, 10**9, None),
+        ]
+        for value, lo, hi, expected in cases:
+            with self.subTest(value=value):
+                self.assertEqual(ManualCategorizer._parse_bounded_int(value, lo, hi), expected)
         
-        # Process second file
-        await self.manual._process_file(test_files[1])
-
-        # After processing second file, we should have 1 file
-        unmatched_final = self.manual._get_unmatched_files()
-        self.assertEqual(len(unmatched_final), 1)
-        
-        # Verify notifications
-        self.notification.notify.assert_has_calls([
-            mock.call(
-                "Successfully categorized: test2.mkv",
-                level="success"
-            ),
-            mock.call(
-                "1 file remaining to categorize",
-                level="info"
-            )
-        ], any_order=False)
\ No newline at end of file
+    async def test_skip_during_search_drops_result(self):
+        """Test a search finishing after /skip doesn't revive the session."""
+        test_file = self._details_session("movie")
+        
+        async def search_then_skip(*args):
+            # The user moves on while TMDB is being searched
+            self.manual._current = None
+            return {"id": 603, "title": "The Matrix", "release_date": "1999-03-31"}
+        self.categorizer.tmdb.search_movie.side_effect = search_then_skip
+        
+        await self.manual._handle_details_response(test_file, "The Matrix (1999)")
+        
+        self.assertIsNone(self.manual._current)
+        self.notification.notify.assert_not_called()
+        
+    async def test_loosened_search_drops_apostrophes(self):
+        """Test the cleaned-up title keeps words joined across apostrophes."""
+        self.categorizer.tmdb.search_movie.return_value = None
+        
+        await self.manual._search_movie_variants("Schindler's.List", "1993")
+        
+        self.categorizer.tmdb.search_movie.assert_any_call("Schindlers List", "1993")
@@ -1,7 +1,8 @@
 """Tests for TMDB client."""
+import asyncio
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
-from media_manager.watcher.tmdb_client import TMDBClient
+from media_manager.watcher.tmdb_client import TMDBClient, _NOT_FOUND
 
 @pytest.fixture
 def tmdb_client():
@@ -85,4 +86,73 @@ async def test_invalid_json_handling(tmdb_client, mock_response):
     
     with patch("aiohttp.ClientSession.get", return_value=mock_response):
         results = await tmdb_client.search_movie("test")
-        assert results == []
\ No newline at end of file
+        assert results == []
+
+
+async def test_make_request_caches_responses(tmdb_client):
+    data = {"id": 1, "title": "Test Movie"}
+    with patch.object(tmdb_client, "_fetch", AsyncMock(return_value=data)) as mock_fetch:
+        assert await tmdb_client._make_request("movie/1") == data
+        assert await tmdb_client._make_request("movie/1") == data
+        assert mock_fetch.await_count == 1
+        
+        await tmdb_client._make_request("movie/1", bypass_cache=True)
+        assert mock_fetch.await_count == 2
+
+async def test_make_request_caches_not_found(tmdb_client):
+    with patch.object(tmdb_client, "_fetch", AsyncMock(return_value=_NOT_FOUND)) as mock_fetch:
+        assert await tmdb_client._make_request("movie/404") is None
+        assert await tmdb_client._make_request("movie/404") is None
+        assert mock_fetch.await_count == 1
+        
+    # Failed requests are not cached
+    with patch.object(tmdb_client, "_fetch", AsyncMock(return_value=None)) as mock_fetch:
+        await tmdb_client._make_request("movie/500")
+        await tmdb_client._make_request("movie/500")
+        assert mock_fetch.await_count == 2
+
+async def test_make_request_coalesces_concurrent_requests(tmdb_client):
+    data = {"id": 1, "title": "Test Movie"}
+    
+    async def slow_fetch(endpoint, params):
+        await asyncio.sleep(0.01)
+        return data
+        
+    with patch.object(tmdb_client, "_fetch", AsyncMock(side_effect=slow_fetch)) as mock_fetch:
+        results = await asyncio.gather(
+            tmdb_client._make_request("search/movie", {"query": "test"}, bypass_cache=True),
+            tmdb_client._make_request("search/movie", {"query": "test"}, bypass_cache=True),
+        )
+        assert results == [data, data]
+        assert mock_fetch.await_count == 1
+        assert not tmdb_client._inflight
+
+async def test_search_sends_unquoted_query(tmdb_client, mock_response):
+    # aiohttp encodes params itself, so the title must not be pre-quoted
+    mock_response.headers = {}
+    mock_response.json = AsyncMock(return_value={"results": []})
+    session = MagicMock()
+    session.get = MagicMock(return_value=mock_response)
+    
+    with patch.object(tmdb_client, "_get_session", AsyncMock(return_value=session)):
+        await tmdb_client.search_movie("Fast & Furious")
+        await tmdb_client.search_tv_show("Law.and.Order")
+        
+    queries = [call.kwargs["params"]["query"] for call in session.get.call_args_list]
+    assert queries == ["Fast & Furious", "Law and Order"]
+
+async def test_fetch_gives_up_after_repeated_rate_limiting(tmdb_client, mock_response):
+    mock_response.status = 429
+    mock_response.headers = {"Retry-After": "1"}
+    session = MagicMock()
+    session.get = MagicMock(return_value=mock_response)
+    
+    with patch.object(tmdb_client, "_get_session", AsyncMock(return_value=session)), \
+            patch("asyncio.sleep", AsyncMock()) as mock_sleep:
+        assert await tmdb_client._fetch("search/movie", {"query": "test"}) is None
+        
+    assert session.get.call_count == TMDBClient.MAX_ATTEMPTS
+    delays = [call.args[0] for call in mock_sleep.await_args_list]
+    assert len(delays) == TMDBClient.MAX_ATTEMPTS - 1
+    assert delays == sorted(delays)
+    assert all(delay <= TMDBClient.MAX_BACKOFF for delay in delays)